@@ -0,0 +1,172 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from question_index import QuestionIndex, normalize_question
+
+
+def fingerprint(text):
+    if not text:
+        return ""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """In-memory LRU in front of an SQLite store, keyed by question, resume and prompt version
+
+    With a similarity threshold set, a miss falls back to the closest previously
+    answered question (see QuestionIndex), so paraphrases and noisy
+    transcriptions of the same question are served from the cache too.
+    """
+
+    def __init__(self, path=None, max_memory=256, max_disk=5000, ttl=7 * 24 * 3600,
+                 similarity_threshold=0.85):
+        self.path = path
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self.ttl = ttl
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.index = None
+        if similarity_threshold:
+            self.index = QuestionIndex(threshold=similarity_threshold, max_entries=max_disk)
+
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute("""CREATE TABLE IF NOT EXISTS answers (
+                    key TEXT PRIMARY KEY,
+                    question TEXT,
+                    answer TEXT,
+                    created REAL,
+                    accessed REAL,
+                    context TEXT)""")
+                columns = [row[1] for row in self._db.execute("PRAGMA table_info(answers)")]
+                if "context" not in columns:
+                    self._db.execute("ALTER TABLE answers ADD COLUMN context TEXT")
+                self._db.commit()
+                self._load_index()
+            except sqlite3.Error as e:
+                print(f"Error opening answer cache: {e}")
+                self._db = None
+
+    def _load_index(self):
+        if self.index is None:
+            return
+        rows = self._db.execute("""SELECT key, question, context FROM answers
+            WHERE created >= ? AND context IS NOT NULL ORDER BY created""",
+                                (time.time() - self.ttl,))
+        for key, question, context in rows:
+            self.index.add(question, key, context)
+
+    @staticmethod
+    def make_context(resume_hash="", version=""):
+        return f"{version}\x00{resume_hash}"
+
+    @staticmethod
+    def make_key(question, resume_hash="", version=""):
+        raw = f"{version}\x00{resume_hash}\x00{normalize_question(question)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key, answer, created):
+        self._memory[key] = (answer, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def get(self, question, resume_hash="", version=""):
+        key = self.make_key(question, resume_hash, version)
+        answer = self._lookup(key)
+        if answer is not None or self.index is None:
+            return answer
+
+        match = self.index.search(question, self.make_context(resume_hash, version))
+        if match is not None:
+            similar_key, score, matched_question = match
+            answer = self._lookup(similar_key, count=False)
+            if answer is not None:
+                print(f"Using cached answer for similar question ({score:.2f}): {matched_question}")
+                with self._lock:
+                    self.misses -= 1
+                    self.similar_hits += 1
+        return answer
+
+    def _lookup(self, key, count=True):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                answer, created = entry
+                if now - created <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += count
+                    return answer
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT answer, created FROM answers WHERE key = ?",
+                                           (key,)).fetchone()
+                    if row and now - row[1] <= self.ttl:
+                        self._db.execute("UPDATE answers SET accessed = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, row[0], row[1])
+                        self.disk_hits += count
+                        return row[0]
+                except sqlite3.Error as e:
+                    print(f"Error reading answer cache: {e}")
+
+            self.misses += count
+            return None
+
+    def put(self, question, answer, resume_hash="", version=""):
+        if not answer:
+            return
+        key = self.make_key(question, resume_hash, version)
+        context = self.make_context(resume_hash, version)
+        now = time.time()
+        if self.index is not None:
+            self.index.add(question, key, context)
+        with self._lock:
+            self._remember(key, answer, now)
+            if self._db is None:
+                return
+            try:
+                self._db.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?)",
+                                 (key, question, answer, now, now, context))
+                # Expired entries first, then the least recently used beyond the size limit
+                self._db.execute("DELETE FROM answers WHERE created < ?", (now - self.ttl,))
+                self._db.execute("""DELETE FROM answers WHERE key IN (
+                    SELECT key FROM answers ORDER BY accessed DESC LIMIT -1 OFFSET ?)""",
+                                 (self.max_disk,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Error writing answer cache: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self.index is not None:
+                self.index = QuestionIndex(threshold=self.index.threshold, max_entries=self.max_disk)
+            if self._db is not None:
+                self._db.execute("DELETE FROM answers")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits + self.similar_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
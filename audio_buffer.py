@@ -0,0 +1,103 @@
+import threading
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity audio buffer written in place from the audio callback"""
+
+    def __init__(self, capacity, channels=1, dtype=np.float32, sample_rate=None, spill=False):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self.sample_rate = sample_rate
+        self.spill = spill
+
+        # Every frame is stored twice, `capacity` apart, so any window of up to
+        # `capacity` frames ending at the write head is a single contiguous slice
+        # and can be handed out as a view instead of a copy.
+        self._data = np.zeros((2 * self.capacity, channels), dtype=self.dtype)
+        self._head = 0
+        self._filled = 0
+        self._spilled = []
+        self._lock = threading.Lock()
+        self.total_written = 0
+
+    def __len__(self):
+        return self._filled
+
+    def write(self, block):
+        block = np.asarray(block, dtype=self.dtype).reshape(-1, self.channels)
+        count = len(block)
+        if count == 0:
+            return
+
+        with self._lock:
+            if self.spill:
+                # Keep the frames that are about to be overwritten
+                overflow = self._filled + count - self.capacity
+                if overflow > 0:
+                    lost = min(overflow, self._filled)
+                    if lost:
+                        self._spilled.append(self._latest(self._filled)[:lost].copy())
+                    if count > self.capacity:
+                        self._spilled.append(block[:count - self.capacity].copy())
+
+            self.total_written += count
+            if count > self.capacity:
+                block = block[-self.capacity:]
+                count = self.capacity
+
+            cap = self.capacity
+            head = self._head
+            first = min(count, cap - head)
+            self._data[head:head + first] = block[:first]
+            self._data[head + cap:head + cap + first] = block[:first]
+            rest = count - first
+            if rest:
+                self._data[:rest] = block[first:]
+                self._data[cap:cap + rest] = block[first:]
+
+            self._head = (head + count) % cap
+            self._filled = min(cap, self._filled + count)
+
+    def _latest(self, frames):
+        frames = max(0, min(int(frames), self._filled))
+        end = self._head + self.capacity
+        return self._data[end - frames:end]
+
+    def latest(self, frames):
+        """Return a zero-copy view of the most recent frames, oldest first"""
+        with self._lock:
+            return self._latest(frames)
+
+    def last_seconds(self, seconds):
+        if not self.sample_rate:
+            raise ValueError("sample_rate is required for time based reads")
+        return self.latest(int(seconds * self.sample_rate))
+
+    def read_since(self, position):
+        """Return a view of the frames written after `position` and the new position
+
+        Positions count frames since the last clear. Frames that already left
+        the ring are skipped.
+        """
+        with self._lock:
+            total = self.total_written
+            return self._latest(total - position), total
+
+    def read_all(self):
+        """Return a copy of everything captured, including spilled frames"""
+        with self._lock:
+            parts = self._spilled + [self._latest(self._filled)]
+            if len(parts) == 1:
+                return parts[0].copy()
+            return np.concatenate(parts, axis=0)
+
+    def clear(self):
+        with self._lock:
+            self._head = 0
+            self._filled = 0
+            self._spilled = []
+            self.total_written = 0
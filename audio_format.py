@@ -0,0 +1,97 @@
+import math
+import numpy as np
+
+# Speech recognizers work at 16 kHz; anything above that is wasted bytes
+SPEECH_RATE = 16000
+
+
+def to_int16(samples):
+    """Accept raw PCM bytes, int16 or float samples and return mono int16"""
+    if isinstance(samples, (bytes, bytearray)):
+        return np.frombuffer(samples, dtype=np.int16)
+    samples = np.asarray(samples)
+    if samples.ndim > 1:
+        samples = samples[:, 0]
+    if samples.dtype == np.int16:
+        return samples
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def to_float32(samples):
+    """Mono float32 in [-1, 1] from int16 or float samples"""
+    samples = np.asarray(samples)
+    if samples.ndim > 1:
+        samples = samples[:, 0]
+    if samples.dtype == np.int16:
+        return samples.astype(np.float32) / 32768
+    return samples.astype(np.float32, copy=False)
+
+
+class PolyphaseResampler:
+    """Streaming rational-ratio resampler (upsample by L, low-pass, keep every M-th sample)
+
+    Only the polyphase branches that produce output samples are evaluated, and
+    a whole block is computed with one gather and one multiply-sum.
+    """
+
+    def __init__(self, in_rate, out_rate, taps_per_phase=24, beta=8.0):
+        divisor = math.gcd(int(in_rate), int(out_rate))
+        self.up = int(out_rate) // divisor
+        self.down = int(in_rate) // divisor
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.taps = taps_per_phase
+
+        # Windowed-sinc prototype at the upsampled rate, cut off below the lower Nyquist
+        length = self.up * taps_per_phase
+        cutoff = 0.45 / max(self.up, self.down)
+        n = np.arange(length) - (length - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta) * self.up
+        # phases[p, k] = prototype[p + k * up]
+        self._phases = prototype.reshape(taps_per_phase, self.up).T.astype(np.float32)
+        self._tap_offsets = np.arange(taps_per_phase)
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._next = 0
+
+    def process(self, samples):
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if not len(samples):
+            return np.zeros(0, dtype=np.float32)
+
+        buffer = np.concatenate([self._history, samples])
+        available = len(samples) * self.up
+        count = max(0, -(-(available - self._next) // self.down))
+
+        positions = self._next + self.down * np.arange(count)
+        inputs = positions // self.up + (self.taps - 1)
+        phases = positions % self.up
+        window = buffer[inputs[:, None] - self._tap_offsets[None, :]]
+        output = np.einsum('ij,ij->i', self._phases[phases], window)
+
+        self._next += count * self.down - available
+        self._history = buffer[len(buffer) - (self.taps - 1):]
+        return output
+
+
+class CaptureFormat:
+    """Turn captured blocks into mono int16 at the speech rate, ready for disk and STT"""
+
+    def __init__(self, in_rate, out_rate=SPEECH_RATE):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.resampler = PolyphaseResampler(in_rate, out_rate) if in_rate != out_rate else None
+
+    def reset(self):
+        if self.resampler:
+            self.resampler.reset()
+
+    def process(self, block):
+        if isinstance(block, (bytes, bytearray)):
+            block = np.frombuffer(block, dtype=np.int16)
+        samples = to_float32(block)
+        if self.resampler:
+            samples = self.resampler.process(samples)
+        return to_int16(samples)
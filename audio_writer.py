@@ -0,0 +1,134 @@
+import os
+import queue
+import threading
+import numpy as np
+from startup import lazy_import
+from tracing import span
+
+sf = lazy_import('soundfile')
+
+FORMATS = {
+    'flac': ('FLAC', '.flac'),
+    'wav': ('WAV', '.wav'),
+}
+
+
+class StreamingWriter:
+    """Append audio chunks to disk from a background thread as they arrive"""
+
+    def __init__(self, path, sample_rate, channels=1, format='flac', segment_seconds=None,
+                 subtype='PCM_16', flush_seconds=1.0):
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported format: {format}")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.format = format
+        self.subtype = subtype
+        self.segment_frames = int(segment_seconds * sample_rate) if segment_seconds else None
+        self.flush_frames = int(flush_seconds * sample_rate)
+
+        base, _ = os.path.splitext(path)
+        self.path = base + FORMATS[format][1]
+        self.files = []
+        self.frames_written = 0
+        self.error = None
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._file = None
+        self._segment_written = 0
+        self._unflushed = 0
+
+    def start(self):
+        self.files = []
+        self.frames_written = 0
+        self.error = None
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def write(self, chunk):
+        """Queue a chunk for writing; never blocks the caller"""
+        self._queue.put_nowait(chunk)
+
+    def close(self, timeout=5.0):
+        """Finish the pending chunks and return the list of written files"""
+        with span("audio_write", format=self.format):
+            if self._thread:
+                self._queue.put(None)
+                self._thread.join(timeout=timeout)
+                self._thread = None
+        return list(self.files)
+
+    def _segment_path(self):
+        if not self.segment_frames:
+            return self.path
+        base, ext = os.path.splitext(self.path)
+        return f"{base}_{len(self.files):03d}{ext}"
+
+    def _open_segment(self):
+        path = self._segment_path()
+        self._file = sf.SoundFile(path, mode='w', samplerate=self.sample_rate, channels=self.channels,
+                                  format=FORMATS[self.format][0], subtype=self.subtype)
+        self.files.append(path)
+        self._segment_written = 0
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_chunk(self, chunk):
+        if isinstance(chunk, (bytes, bytearray)):
+            # Raw PCM from PyAudio
+            chunk = np.frombuffer(chunk, dtype=np.int16)
+        chunk = np.asarray(chunk).reshape(-1, self.channels)
+
+        while len(chunk):
+            if self._file is None:
+                self._open_segment()
+            count = len(chunk)
+            if self.segment_frames:
+                count = min(count, self.segment_frames - self._segment_written)
+            self._file.write(chunk[:count])
+            chunk = chunk[count:]
+            self._segment_written += count
+            self._unflushed += count
+            self.frames_written += count
+
+            if self.segment_frames and self._segment_written >= self.segment_frames:
+                # Finished segments are complete files even if the app crashes later
+                self._close_segment()
+                self._unflushed = 0
+
+        if self._file is not None and self._unflushed >= self.flush_frames:
+            self._file.flush()
+            self._unflushed = 0
+
+    def _run(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            if self.error is not None:
+                # Keep draining so a failed disk never backs up into memory
+                continue
+            try:
+                self._write_chunk(chunk)
+            except Exception as e:
+                print(f"Error writing audio: {e}")
+                self.error = e
+        self._close_segment()
+
+
+def join_segments(files, path, block_frames=65536):
+    """Copy the segment files, in order, into one file at `path` without loading them whole"""
+    with sf.SoundFile(files[0]) as first:
+        sample_rate, channels, format, subtype = first.samplerate, first.channels, first.format, first.subtype
+    with sf.SoundFile(path, mode='w', samplerate=sample_rate, channels=channels, format=format,
+                      subtype=subtype) as out:
+        for segment in files:
+            for block in sf.blocks(segment, blocksize=block_frames, dtype='int16', always_2d=True):
+                out.write(block)
+    return path
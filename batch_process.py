@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+from interview_engine import load_transcriber, make_answerer
+
+AUDIO_EXTENSIONS = ('.wav', '.flac')
+
+# Each worker process loads its own transcriber (and speech model) once
+_transcriber = None
+
+
+def _init_worker(engine):
+    global _transcriber
+    _transcriber = load_transcriber(engine)
+    _transcriber.warm_up()
+
+
+def _transcribe(path):
+    started = time.perf_counter()
+    text = _transcriber.transcribe(path)
+    return text, round((time.perf_counter() - started) * 1000, 1)
+
+
+def find_audio_files(directory):
+    """All recordings under `directory`, as paths relative to it, in a stable order"""
+    found = []
+    for folder, _, names in os.walk(directory):
+        for name in names:
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                found.append(os.path.relpath(os.path.join(folder, name), directory))
+    return sorted(found)
+
+
+def load_finished(output_file):
+    """Files that already have a successful record in the output, so a rerun can skip them"""
+    finished = set()
+    if not os.path.exists(output_file):
+        return finished
+    with open(output_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line of an interrupted run may be cut off
+                continue
+            if record.get("status") == "ok":
+                finished.add(record["file"])
+    return finished
+
+
+class BatchProcessor:
+    """Transcribe a directory of recordings in a process pool and answer them concurrently
+
+    Transcription is CPU-bound (or blocks on the speech API) and runs in
+    `processes` worker processes. Answers only wait on the network, so they
+    run on threads, at most `concurrency` at a time. Each file gets one JSON
+    line in `output_file` as soon as it is done.
+    """
+
+    def __init__(self, output_file, transcriber=None, answerer=None, processes=None, concurrency=4):
+        self.output_file = output_file
+        self.transcriber = transcriber
+        self.answerer = answerer
+        self.processes = processes or os.cpu_count() or 1
+        self.concurrency = concurrency
+        self.counts = {"ok": 0, "error": 0, "skipped": 0}
+        self._lock = threading.Lock()
+        self._output = None
+
+    def _write(self, record):
+        record["time"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            self._output.write(json.dumps(record) + "\n")
+            self._output.flush()
+            self.counts[record["status"]] += 1
+
+    def _answer(self, record):
+        started = time.perf_counter()
+        try:
+            record["answer"] = "".join(self.answerer.stream_interview_response(record["transcript"]))
+            record["answer_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        except Exception as e:
+            print(f"Error answering {record['file']}: {e}")
+            record["status"] = "error"
+            record["error"] = f"answer: {e}"
+        self._write(record)
+
+    def run(self, directory, restart=False):
+        files = find_audio_files(directory)
+        if restart and os.path.exists(self.output_file):
+            os.remove(self.output_file)
+        finished = load_finished(self.output_file)
+        pending = [name for name in files if name not in finished]
+        self.counts["skipped"] = len(files) - len(pending)
+        print(f"{len(files)} recordings found, {len(pending)} to process "
+              f"({self.processes} processes, {self.concurrency} concurrent answers)")
+
+        started = time.perf_counter()
+        self._output = open(self.output_file, 'a', encoding='utf-8')
+        transcribe_pool = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                              initargs=(self.transcriber,))
+        answer_pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            futures = {transcribe_pool.submit(_transcribe, os.path.join(directory, name)): name
+                       for name in pending}
+            for future in as_completed(futures):
+                record = {"file": futures[future], "status": "ok"}
+                try:
+                    record["transcript"], record["transcribe_ms"] = future.result()
+                except Exception as e:
+                    print(f"Error transcribing {record['file']}: {e}")
+                    record.update(status="error", error=f"transcribe: {e}")
+                    self._write(record)
+                    continue
+
+                if self.answerer is None or not record["transcript"]:
+                    self._write(record)
+                else:
+                    answer_pool.submit(self._answer, record)
+        finally:
+            # On Ctrl+C, drop what hasn't started; finished files are already on disk
+            transcribe_pool.shutdown(cancel_futures=True)
+            answer_pool.shutdown(wait=True)
+            self._output.close()
+
+        elapsed = time.perf_counter() - started
+        summary = dict(self.counts, seconds=round(elapsed, 1))
+        done = self.counts["ok"] + self.counts["error"]
+        if done and elapsed > 0:
+            summary["files_per_minute"] = round(done * 60 / elapsed, 1)
+        return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Transcribe and answer every recording in a directory. "
+                    "Rerunning with the same output file skips recordings that already succeeded.")
+    parser.add_argument("directory", help="directory of .wav/.flac recordings (searched recursively)")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSON-lines results file")
+    parser.add_argument("--processes", type=int, help="transcription processes (default: CPU count)")
+    parser.add_argument("--concurrency", type=int, default=4, help="answers requested at the same time")
+    parser.add_argument("--transcriber", help="google, vosk or simulated (default: TRANSCRIBER or google)")
+    parser.add_argument("--answerer", choices=["rest", "sdk", "simulated"],
+                        help="rest (default with GEMINI_API_KEY), sdk or simulated")
+    parser.add_argument("--resume", help="plain-text resume used to tailor answers (rest answerer)")
+    parser.add_argument("--no-answer", action="store_true", help="only transcribe")
+    parser.add_argument("--restart", action="store_true", help="discard earlier results and start over")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    try:
+        answerer = None if args.no_answer else make_answerer(args.answerer, args.resume, args.concurrency)
+        processor = BatchProcessor(args.output, args.transcriber, answerer, args.processes, args.concurrency)
+        summary = processor.run(args.directory, restart=args.restart)
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to continue")
+        return 130
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"Batch finished: {summary}")
+    return 0 if not summary["error"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,544 @@
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import numpy as np
+from startup import lazy_import
+from audio_format import SPEECH_RATE
+from audio_writer import StreamingWriter
+from transcriber import Transcriber
+from tracing import percentile, tracer
+
+sf = lazy_import('soundfile')
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp', 'benchmark')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'baseline.json')
+
+QUESTIONS = [
+    "Tell me about yourself.",
+    "What is your experience with Python and Django?",
+    "How do you handle difficult team members?",
+    "Describe a situation where you had to meet a tight deadline.",
+    "How would you design a rate limiter for a public API?",
+    "What's your approach to solving complex problems?",
+    "Tell me about a project you're particularly proud of and what you would do differently today.",
+    "How do you prioritize tasks when everything seems urgent?",
+]
+
+RESUME = """SUMMARY
+Backend engineer with six years of experience building Python services.
+
+EXPERIENCE
+- Led the migration of a Django monolith to services on Kubernetes
+- Built a rate limiting gateway handling 20k requests per second
+- Mentored four junior engineers and ran the team's code review process
+
+SKILLS
+- Python, Django, PostgreSQL, Redis, Kubernetes, AWS
+"""
+
+ANSWER = ("In my last role I owned exactly this kind of problem end to end. I started by agreeing on "
+          "what success looked like, broke the work into small steps we could ship and measure, and kept "
+          "everyone informed as we went. The result was delivered on time and the approach became the "
+          "team's default for similar projects.")
+
+STAGES = ("flush", "transcribe", "first_chunk", "answer", "total")
+
+
+def synthesize_speech(seconds, sample_rate=SPEECH_RATE, seed=0):
+    """Speech-like test signal: voiced syllables with a moving pitch, fricative noise and pauses
+
+    Not intelligible, but it has the energy envelope, spectrum and zero-crossing
+    behaviour that the VAD and the audio path see with real speech.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * sample_rate)
+    t = np.arange(total) / sample_rate
+
+    # Glottal source: harmonics of a drifting pitch with a -6 dB/octave tilt
+    f0 = rng.uniform(100, 190) * (1 + 0.08 * np.sin(2 * np.pi * rng.uniform(0.3, 1.0) * t))
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 25))
+
+    # Syllables of 120-280 ms, with a longer pause between some words
+    envelope = np.zeros(total)
+    fricative = np.zeros(total)
+    position = int(0.2 * sample_rate)
+    while position < total - int(0.2 * sample_rate):
+        length = int(rng.uniform(0.12, 0.28) * sample_rate)
+        end = min(position + length, total)
+        envelope[position:end] = np.hanning(end - position) * rng.uniform(0.5, 1.0)
+        if rng.random() < 0.3:
+            noise_length = min(int(0.06 * sample_rate), total - end)
+            fricative[end:end + noise_length] = np.hanning(noise_length) * 0.15
+        position = end + int(rng.uniform(0.03, 0.08) * sample_rate)
+        if rng.random() < 0.15:
+            position += int(rng.uniform(0.2, 0.4) * sample_rate)
+
+    noise = rng.standard_normal(total)
+    signal = 0.3 * voiced * envelope + fricative * np.diff(noise, prepend=0) + 0.003 * noise
+    signal /= max(1e-9, np.max(np.abs(signal))) / 0.8
+    return (signal * 32767).astype(np.int16)
+
+
+def make_fixtures(directory=None, seed=0):
+    """Write one WAV per benchmark question; returns [(path, question)]"""
+    directory = directory or os.path.join(BENCH_DIR, 'fixtures')
+    os.makedirs(directory, exist_ok=True)
+    fixtures = []
+    for i, question in enumerate(QUESTIONS):
+        path = os.path.join(directory, f'question_{i:02d}.wav')
+        if not os.path.exists(path):
+            # Roughly the speaking time of the question
+            seconds = 1.0 + 0.35 * len(question.split())
+            sf.write(path, synthesize_speech(seconds, seed=seed + i), SPEECH_RATE)
+        fixtures.append((path, question))
+    return fixtures
+
+
+def audio_key(samples):
+    return hashlib.sha1(np.ascontiguousarray(samples).tobytes()).hexdigest()
+
+
+class Latency:
+    """Delay model for a stand-in server: base +/- gaussian jitter, with occasional spikes"""
+
+    def __init__(self, base_ms, jitter_ms=0.0, spike_rate=0.0, spike_ms=0.0, seed=None):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self.spike_rate = spike_rate
+        self.spike_ms = spike_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, extra_ms=0.0):
+        with self._lock:
+            delay = self._random.gauss(self.base_ms, self.jitter_ms) if self.jitter_ms else self.base_ms
+            if self.spike_rate and self._random.random() < self.spike_rate:
+                delay += self.spike_ms
+        return max(0.0, delay + extra_ms) / 1000
+
+    def describe(self):
+        return {"base_ms": self.base_ms, "jitter_ms": self.jitter_ms,
+                "spike_rate": self.spike_rate, "spike_ms": self.spike_ms}
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that gave up (timeouts, cancelled hedges) are expected here
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class StandInServer:
+    """Threaded local HTTP server with keep-alive, started on a free port"""
+
+    handler = None
+
+    def __init__(self):
+        handler = type('Handler', (self.handler,), {'server_config': self})
+        self.httpd = _QuietServer(('127.0.0.1', 0), handler)
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and each streamed chunk are separate writes; without this, delayed
+    # ACKs add ~40 ms to the first chunk that the real API doesn't have
+    disable_nagle_algorithm = True
+    server_config = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+class _GeminiHandler(_Handler):
+    def do_POST(self):
+        config = self.server_config
+        config.count()
+        self._read_body()
+        url = urlsplit(self.path)
+        model = url.path.rsplit('/', 1)[-1].split(':')[0]
+        time.sleep(config.latency_for(model).sample())
+        if config.should_fail():
+            self._send_json({"error": {"code": 503, "message": "The model is overloaded"}}, status=503)
+            return
+
+        pieces = config.answer_pieces()
+        if url.path.endswith(':generateContent'):
+            if config.chunk_interval_ms:
+                time.sleep(config.chunk_interval_ms * (len(pieces) - 1) / 1000)
+            self._send_json(config.response(ANSWER))
+            return
+        if not url.path.endswith(':streamGenerateContent'):
+            self._send_json({"error": {"message": f"Unknown method {url.path}"}}, status=404)
+            return
+
+        # Chunked transfer keeps the connection reusable after the stream ends
+        sse = 'alt=sse' in url.query
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream' if sse else 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        if not sse:
+            self._write_chunk(b"[")
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(config.chunk_interval_ms / 1000)
+            event = json.dumps(config.response(piece))
+            if sse:
+                self._write_chunk(f"data: {event}\r\n\r\n".encode('utf-8'))
+            else:
+                self._write_chunk(((',' if i else '') + event).encode('utf-8'))
+        if not sse:
+            self._write_chunk(b"]")
+        self._write_chunk(b"")
+
+
+class GeminiStandIn(StandInServer):
+    """Answers generateContent and streamGenerateContent (SSE or JSON array) for any model
+
+    `latency` is the time to the first byte (`model_latency` overrides it per
+    model); streamed answers then arrive in `chunks` pieces, `chunk_interval_ms`
+    apart. A share `error_rate` of requests fail with 503.
+    """
+
+    handler = _GeminiHandler
+
+    def __init__(self, latency, chunks=6, chunk_interval_ms=40, model_latency=None, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.model_latency = model_latency or {}
+        self.chunks = chunks
+        self.chunk_interval_ms = chunk_interval_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        super().__init__()
+
+    def latency_for(self, model):
+        return self.model_latency.get(model, self.latency)
+
+    def should_fail(self):
+        with self._lock:
+            return self.error_rate and self._random.random() < self.error_rate
+
+    def answer_pieces(self):
+        words = ANSWER.split(" ")
+        size = max(1, math.ceil(len(words) / self.chunks))
+        return [" ".join(words[i:i + size]) + " " for i in range(0, len(words), size)]
+
+    @staticmethod
+    def response(text):
+        return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+
+    def describe(self):
+        return dict(self.latency.describe(), chunks=self.chunks, chunk_interval_ms=self.chunk_interval_ms,
+                    error_rate=self.error_rate,
+                    models={model: latency.describe() for model, latency in self.model_latency.items()})
+
+
+class _SpeechHandler(_Handler):
+    def do_POST(self):
+        config = self.server_config
+        config.count()
+        audio, rate = sf.read(io.BytesIO(self._read_body()), dtype='int16')
+        seconds = len(audio) / rate
+        # Recognizers take longer for longer audio
+        time.sleep(config.latency.sample(config.rtf * seconds * 1000))
+        self._send_json({"text": config.transcripts.get(audio_key(audio), "")})
+
+
+class SpeechStandIn(StandInServer):
+    """Speech-to-text stand-in: returns the question a fixture was generated for
+
+    Delay is the latency model plus `rtf` times the audio duration.
+    """
+
+    handler = _SpeechHandler
+
+    def __init__(self, latency, rtf=0.1):
+        self.latency = latency
+        self.rtf = rtf
+        self.transcripts = {}
+        super().__init__()
+
+    def register(self, path, text):
+        audio, _ = sf.read(path, dtype='int16')
+        self.transcripts[audio_key(audio)] = text
+
+    def describe(self):
+        return dict(self.latency.describe(), rtf=self.rtf)
+
+
+class StandInTranscriber(Transcriber):
+    """Sends each recording to the speech stand-in as FLAC, like the Google recognizer does"""
+
+    name = "standin"
+
+    def __init__(self, url):
+        self.url = url + "/recognize"
+
+    def transcribe(self, audio_file):
+        audio, rate = sf.read(audio_file, dtype='int16')
+        buffer = io.BytesIO()
+        sf.write(buffer, audio, rate, format='FLAC')
+        request = urllib.request.Request(self.url, data=buffer.getvalue(),
+                                         headers={'Content-Type': f'audio/x-flac; rate={rate}'})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(response.read()).get("text", "")
+
+
+class NullCache:
+    """Answer cache that never hits, so every run reaches the stand-in"""
+
+    def get(self, *args, **kwargs):
+        return None
+
+    def put(self, *args, **kwargs):
+        pass
+
+
+def summarize(samples):
+    return {stage: {"count": len(values),
+                    "p50": round(percentile(values, 50), 1),
+                    "p95": round(percentile(values, 95), 1),
+                    "p99": round(percentile(values, 99), 1),
+                    "max": round(max(values), 1)}
+            for stage, values in samples.items() if values}
+
+
+def build_paths(names, resume=True):
+    """The answerers for each app, pointed at the stand-in through GEMINI_BASE_URL"""
+    from interview_engine import GeminiAPI, ResumeAnswerer
+
+    paths = {}
+    if "assistant" in names:
+        # interview_assistant.py: pooled REST client with resume context
+        answerer = ResumeAnswerer("benchmark-key", cache=NullCache())
+        if resume:
+            answerer.load_resume(RESUME)
+        answerer.client.prewarm()
+        paths["assistant"] = answerer
+    if "helper" in names:
+        # interview_helper.py: the google-generativeai SDK
+        answerer = GeminiAPI()
+        answerer.cache = NullCache()
+        if answerer.load_model() is None:
+            print("Skipping the interview_helper path: google-generativeai is not available")
+        else:
+            paths["helper"] = answerer
+    return paths
+
+
+def run_once(engine, samples, block_size=1024):
+    """One question, from the moment recording stops until the answer is complete"""
+    writer = StreamingWriter(os.path.join(BENCH_DIR, 'recording'), SPEECH_RATE, format='flac').start()
+    # Recording: blocks reach the writer while the question is being asked
+    for start in range(0, len(samples), block_size):
+        writer.write(samples[start:start + block_size])
+    while writer.frames_written < len(samples) and writer.error is None:
+        time.sleep(0.001)
+
+    events = {}
+    engine.on_event = lambda event: events.setdefault(event["type"], event)
+    stopped = time.perf_counter()
+    files = writer.close()
+    flushed = time.perf_counter()
+    result = engine.process_file(files[-1])
+    finished = time.perf_counter()
+
+    if result is None or "answer" not in events:
+        raise RuntimeError(events.get("error", {}).get("message", "no answer"))
+    return {
+        "flush": (flushed - stopped) * 1000,
+        "transcribe": events["transcript"]["ms"],
+        "first_chunk": events["answer"]["first_chunk_ms"],
+        "answer": events["answer"]["ms"],
+        "total": (finished - stopped) * 1000,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """List the stages whose p50 or p95 got slower than the baseline by more than `tolerance`"""
+    regressions = []
+    for path, stages in results["paths"].items():
+        for stage, stats in stages.items():
+            before = baseline.get("paths", {}).get(path, {}).get(stage)
+            if not before:
+                continue
+            for key in ("p50", "p95"):
+                # A few ms of slack so near-zero stages don't flap
+                if stats[key] > before[key] * (1 + tolerance) + 2.0:
+                    regressions.append(f"{path}.{stage} {key}: {before[key]} -> {stats[key]} ms")
+    return regressions
+
+
+def print_report(results):
+    for path, stages in results["paths"].items():
+        errors = results["errors"].get(path)
+        print(f"\n{path} ({results['runs']} runs" + (f", {errors} failed)" if errors else ")"))
+        print(f"  {'stage':<12} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+        for stage in STAGES:
+            stats = stages.get(stage)
+            if stats:
+                print(f"  {stage:<12} {stats['p50']:>9.1f} {stats['p95']:>9.1f} "
+                      f"{stats['p99']:>9.1f} {stats['max']:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure stop-to-answer latency against local stand-ins for Gemini and speech-to-text. "
+                    "All times are in milliseconds.")
+    parser.add_argument("--runs", type=int, default=40, help="questions per path")
+    parser.add_argument("--paths", default="helper,assistant", help="comma-separated: helper, assistant")
+    parser.add_argument("--gemini-latency", type=float, default=300, help="time to first byte")
+    parser.add_argument("--gemini-jitter", type=float, default=80)
+    parser.add_argument("--gemini-spike-rate", type=float, default=0.02, help="share of very slow responses")
+    parser.add_argument("--gemini-spike", type=float, default=1500, help="extra delay of a slow response")
+    parser.add_argument("--chunks", type=int, default=6, help="pieces per streamed answer")
+    parser.add_argument("--chunk-interval", type=float, default=40)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0, help="share of requests failing with 503")
+    parser.add_argument("--budget", type=float, help="seconds per question (GEMINI_BUDGET_SECONDS)")
+    parser.add_argument("--retries", type=int, help="retries after a failed attempt (GEMINI_RETRIES)")
+    parser.add_argument("--hedge-model", help="model for hedged requests (GEMINI_HEDGE_MODEL)")
+    parser.add_argument("--hedge-after", type=float, help="seconds before hedging (GEMINI_HEDGE_AFTER)")
+    parser.add_argument("--hedge-latency", type=float, default=150, help="time to first byte of the hedge model")
+    parser.add_argument("--stt-latency", type=float, default=250)
+    parser.add_argument("--stt-jitter", type=float, default=60)
+    parser.add_argument("--stt-rtf", type=float, default=0.1, help="extra STT time per second of audio")
+    parser.add_argument("--no-resume", action="store_true", help="assistant path without resume context")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the results JSON here")
+    parser.add_argument("--trace", help="write a Chrome trace-event file of every span")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="store results as the baseline")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE, help="fail if slower than this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args(argv)
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    model_latency = {}
+    if args.hedge_model:
+        model_latency[args.hedge_model] = Latency(args.hedge_latency, args.gemini_jitter / 2, seed=args.seed + 2)
+    gemini = GeminiStandIn(Latency(args.gemini_latency, args.gemini_jitter, args.gemini_spike_rate,
+                                   args.gemini_spike, seed=args.seed),
+                           args.chunks, args.chunk_interval, model_latency, args.gemini_error_rate,
+                           seed=args.seed + 3).start()
+    speech = SpeechStandIn(Latency(args.stt_latency, args.stt_jitter, seed=args.seed + 1), args.stt_rtf).start()
+    os.environ["GEMINI_BASE_URL"] = gemini.url
+    os.environ["GEMINI_API_KEY"] = "benchmark-key"
+    # The answerers read their call policy from the environment
+    for name, value in (("GEMINI_BUDGET_SECONDS", args.budget), ("GEMINI_RETRIES", args.retries),
+                        ("GEMINI_HEDGE_MODEL", args.hedge_model), ("GEMINI_HEDGE_AFTER", args.hedge_after)):
+        if value is not None:
+            os.environ[name] = str(value)
+
+    from interview_engine import InterviewEngine
+
+    fixtures = make_fixtures(seed=args.seed)
+    for path, question in fixtures:
+        speech.register(path, question)
+    audio = [(sf.read(path, dtype='int16')[0], question) for path, question in fixtures]
+
+    results = {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "runs": args.runs,
+        "config": {"gemini": gemini.describe(), "stt": speech.describe(), "resume": not args.no_resume,
+                   "policy": {"budget": args.budget, "retries": args.retries,
+                              "hedge_model": args.hedge_model, "hedge_after": args.hedge_after}},
+        "paths": {},
+        "errors": {},
+    }
+    try:
+        paths = build_paths([name.strip() for name in args.paths.split(",")], resume=not args.no_resume)
+        for name, answerer in paths.items():
+            engine = InterviewEngine(StandInTranscriber(speech.url), answerer)
+            samples = {stage: [] for stage in STAGES}
+            errors = 0
+            print(f"Running {name} path...")
+            for i in range(args.runs):
+                try:
+                    timings = run_once(engine, audio[i % len(audio)][0])
+                except Exception as e:
+                    print(f"Error in {name} run {i}: {e}")
+                    errors += 1
+                    continue
+                for stage, value in timings.items():
+                    samples[stage].append(value)
+            results["paths"][name] = summarize(samples)
+            results["errors"][name] = errors
+    finally:
+        gemini.stop()
+        speech.stop()
+
+    print_report(results)
+    if args.trace:
+        print(f"\nTrace written to {tracer.export(args.trace)}")
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != results["config"]:
+            print("Warning: the baseline was recorded with different stand-in settings")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
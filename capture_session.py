@@ -0,0 +1,112 @@
+import queue
+import threading
+import time
+import numpy as np
+from audio_buffer import RingBuffer
+from audio_format import CaptureFormat
+from startup import lazy_import
+from vad import SpeechSegmenter
+
+sd = lazy_import('sounddevice')
+
+
+class CaptureSession:
+    """Keep one input stream open and hand out speech segments as they finish"""
+
+    def __init__(self, sample_rate=44100, channels=1, buffer_seconds=30, segmenter=None,
+                 device=None, writer=None, poll_interval=0.05, output_rate=None):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.device = device
+        self.writer = writer
+        self.poll_interval = poll_interval
+
+        # With an output rate, blocks are packed to mono int16 at that rate in the callback
+        self.output_rate = output_rate or sample_rate
+        self.capture_format = CaptureFormat(sample_rate, output_rate) if output_rate else None
+        if self.capture_format:
+            self.buffer = RingBuffer(int(self.output_rate * buffer_seconds), dtype=np.int16,
+                                     sample_rate=self.output_rate)
+        else:
+            self.buffer = RingBuffer(int(sample_rate * buffer_seconds), channels=channels,
+                                     sample_rate=sample_rate)
+        self.segmenter = segmenter or SpeechSegmenter(self.output_rate)
+        self.segments = queue.Queue()
+        self.is_running = False
+        self.error = None
+        self._stream = None
+        self._thread = None
+
+    def start(self):
+        if self.is_running:
+            return False
+
+        self.buffer.clear()
+        self.segmenter.reset()
+        if self.capture_format:
+            self.capture_format.reset()
+        self.error = None
+        if self.writer:
+            self.writer.start()
+
+        self._stream = sd.InputStream(samplerate=self.sample_rate, channels=self.channels,
+                                      device=self.device, callback=self._callback)
+        self._stream.start()
+        self.is_running = True
+
+        self._thread = threading.Thread(target=self._segment_loop)
+        self._thread.daemon = True
+        self._thread.start()
+        print("Capture session started...")
+        return True
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            print(f"Status: {status}")
+        block = self.capture_format.process(indata) if self.capture_format else indata.copy()
+        self.buffer.write(block)
+        if self.writer:
+            self.writer.write(block)
+
+    def _segment_loop(self):
+        # Segmentation runs here so the audio callback only copies frames
+        position = 0
+        try:
+            while self.is_running:
+                time.sleep(self.poll_interval)
+                audio_data, position = self.buffer.read_since(position)
+                for segment in self.segmenter.feed(audio_data[:, 0]):
+                    self.segments.put(segment)
+        except Exception as e:
+            print(f"Error in capture session: {e}")
+            self.error = e
+
+    def get_segment(self, timeout=None):
+        """Return the next finished utterance, or None if none arrived in time"""
+        try:
+            return self.segments.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        if not self.is_running:
+            return None
+
+        self.is_running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        try:
+            self._stream.stop()
+            self._stream.close()
+        finally:
+            self._stream = None
+            if self.writer:
+                self.writer.close()
+
+        # Whatever the speaker was in the middle of saying
+        segment = self.segmenter.flush()
+        if segment is not None:
+            self.segments.put(segment)
+        print("Capture session stopped")
+        return segment
@@ -0,0 +1,134 @@
+import re
+import threading
+from collections import Counter, deque
+from resume_index import estimate_tokens, tokenize
+
+# Questions that explicitly lean on what was said before ("can you elaborate on that?")
+FOLLOW_UP_RE = re.compile(r"\b(elaborate|expand on|more about (that|this|it|those|them)|go back to|"
+                          r"you mentioned|you said|you just said|you talked about|earlier you|"
+                          r"previous (question|answer|project|role|job)|follow up on|what else)\b")
+# A pronoun only refers back when the question names nothing else ("why did you do that?")
+PRONOUN_RE = re.compile(r"\b(that|it|those|them)\b")
+
+
+def clip(text, tokens, keep="start"):
+    """Cut `text` to about `tokens` tokens at a word boundary, keeping its start or its end"""
+    limit = max(0, tokens) * 4
+    if len(text) <= limit:
+        return text
+    limit = max(0, limit - 3)  # room for the "..."
+    if keep == "end":
+        cut = text[len(text) - limit:]
+        return "..." + cut[cut.find(" ") + 1:] if " " in cut else cut
+    cut = text[:limit]
+    return cut[:cut.rfind(" ")] + "..." if " " in cut else cut
+
+
+def first_sentence(text):
+    match = re.match(r"(.+?[.!?])(?:\s|$)", text.strip(), re.S)
+    return match.group(1) if match else text.strip()
+
+
+class ConversationContext:
+    """What has been asked and answered so far, in a bounded number of tokens
+
+    The last `recent_turns` exchanges are kept verbatim. Older ones are
+    compacted into one summary line each (the question and the first
+    sentence of the answer), and once the summary outgrows `summary_tokens`
+    its oldest lines are reduced to a list of topic keywords. render() fits
+    all of this into a hard token budget, so prompt size stays flat however
+    long the interview runs.
+    """
+
+    def __init__(self, recent_turns=3, turn_tokens=150, summary_tokens=200, max_topics=12):
+        self.recent_turns = recent_turns
+        self.turn_tokens = turn_tokens
+        self.summary_tokens = summary_tokens
+        self.max_topics = max_topics
+        self.recent = deque()
+        self.summary = deque()
+        self.topics = Counter()
+        self.turns = 0
+        self._lock = threading.Lock()
+
+    def add_turn(self, question, answer):
+        question, answer = (question or "").strip(), (answer or "").strip()
+        if not question or not answer:
+            return
+        with self._lock:
+            self.recent.append((clip(question, self.turn_tokens), clip(answer, self.turn_tokens)))
+            self.turns += 1
+            while len(self.recent) > self.recent_turns:
+                old_question, old_answer = self.recent.popleft()
+                self.summary.append((clip(old_question, 30), clip(first_sentence(old_answer), 40)))
+            while len(self.summary) > 1 and estimate_tokens(self._format_summary(self.summary)) > self.summary_tokens:
+                old_question, _ = self.summary.popleft()
+                self.topics.update(tokenize(old_question))
+            if len(self.topics) > 4 * self.max_topics:
+                self.topics = Counter(dict(self.topics.most_common(2 * self.max_topics)))
+
+    def is_follow_up(self, question):
+        """Whether `question` probably refers back to the conversation (and shouldn't be answered from cache)"""
+        with self._lock:
+            if not self.recent:
+                return False
+        question = (question or "").lower()
+        if FOLLOW_UP_RE.search(question):
+            return True
+        return PRONOUN_RE.search(question) is not None and len(tokenize(question)) <= 1
+
+    def reset(self):
+        with self._lock:
+            self.recent.clear()
+            self.summary.clear()
+            self.topics.clear()
+            self.turns = 0
+
+    def _format_summary(self, summary):
+        return "\n".join(f"- Q: {question} A: {answer}" for question, answer in summary)
+
+    def _format(self, topics, summary, recent):
+        parts = []
+        if topics:
+            parts.append("Topics covered earlier: " + ", ".join(topics))
+        if summary:
+            parts.append("Earlier questions:\n" + self._format_summary(summary))
+        if recent:
+            parts.append("Most recent exchanges:\n" + "\n".join(
+                f"Interviewer: {question}\nCandidate: {answer}" for question, answer in recent))
+        return "\n\n".join(parts)
+
+    def render(self, budget):
+        """The context as prompt text of at most `budget` tokens ("" if there is none or it can't fit)"""
+        with self._lock:
+            topics = [word for word, _ in self.topics.most_common(self.max_topics)]
+            summary = list(self.summary)
+            recent = list(self.recent)
+
+        # Shed the least useful parts first: topics, the oldest summary lines,
+        # older verbatim turns, and finally the end of the last answer
+        while True:
+            text = self._format(topics, summary, recent)
+            if estimate_tokens(text) <= budget:
+                return text
+            if topics:
+                topics = []
+            elif summary:
+                summary.pop(0)
+            elif len(recent) > 1:
+                recent.pop(0)
+            elif recent:
+                question, answer = recent[0]
+                room = budget - estimate_tokens(self._format([], [], [(question, "")])) - 1
+                if room < 10:
+                    return ""
+                recent = [(question, clip(answer, room))]
+                text = self._format([], [], recent)
+                return text if estimate_tokens(text) <= budget else ""
+            else:
+                return ""
+
+    def stats(self):
+        with self._lock:
+            return {"turns": self.turns, "recent": len(self.recent), "summarized": len(self.summary),
+                    "topics": len(self.topics)}
@@ -0,0 +1,267 @@
+import os
+import queue
+import random
+import threading
+import time
+from tracing import span
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def _env_number(name, default):
+    """The environment variable `name` as the type of `default`; a bad value is reported and ignored"""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        number = type(default)(value)
+    except ValueError:
+        number = None
+    if number is None or number < 0:
+        print(f"Invalid {name} {value!r}; using {default}")
+        return default
+    return number
+
+
+class CallPolicy:
+    """How long one question may wait for the model, and what to do while it waits
+
+    - budget: seconds until the first answer text must arrive
+    - retries: extra attempts after a failed one, separated by jittered exponential backoff
+    - hedge_model: if set and nothing has arrived after `hedge_after` seconds, the same
+      request also goes to this (faster) model and whichever answers first wins
+    """
+
+    def __init__(self, budget=8.0, retries=2, backoff=0.25, max_backoff=2.0, hedge_model=None, hedge_after=1.5):
+        self.budget = budget
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_model = hedge_model
+        self.hedge_after = hedge_after
+
+    @classmethod
+    def from_env(cls):
+        return cls(budget=_env_number("GEMINI_BUDGET_SECONDS", 8.0),
+                   retries=_env_number("GEMINI_RETRIES", 2),
+                   hedge_model=os.getenv("GEMINI_HEDGE_MODEL") or None,
+                   hedge_after=_env_number("GEMINI_HEDGE_AFTER", 1.5))
+
+    def backoff_delay(self, attempt):
+        # "Full jitter": spreads retries out so they don't arrive in bursts
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+
+class Deadline:
+    def __init__(self, seconds):
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.expires
+
+
+def _always(error):
+    return True
+
+
+class _Attempts:
+    """Launches attempts on daemon threads and decides when to retry or hedge
+
+    A call that ignores its timeout can't hold the caller past the deadline;
+    it is abandoned and its result discarded.
+    """
+
+    def __init__(self, policy, primary, hedge, retryable):
+        self.policy = policy
+        self.primary = primary
+        self.hedge = hedge if policy.hedge_model else None
+        self.retryable = retryable or _always
+        self.deadline = Deadline(policy.budget)
+        self.hedge_at = time.monotonic() + policy.hedge_after
+        self.results = queue.Queue()
+        self.attempts = 0
+        self.in_flight = 0
+        self.hedged = False
+        self.retry_at = None
+        self.last_error = None
+
+    def launch(self, target, label):
+        self.in_flight += 1
+        thread = threading.Thread(target=target, args=(self.deadline.remaining(), label))
+        thread.daemon = True
+        thread.start()
+
+    def wait_time(self):
+        now = time.monotonic()
+        wait = self.deadline.remaining()
+        if self.hedge and not self.hedged:
+            wait = min(wait, max(0.0, self.hedge_at - now))
+        if self.retry_at is not None:
+            wait = min(wait, max(0.0, self.retry_at - now))
+        return wait
+
+    def on_idle(self, start_primary, start_hedge):
+        """Nothing arrived in time: fail, hedge or retry"""
+        if self.deadline.expired:
+            raise DeadlineExceeded(f"No answer within {self.policy.budget:.1f}s"
+                                   + (f" (last error: {self.last_error})" if self.last_error else ""))
+        now = time.monotonic()
+        if self.hedge and not self.hedged and now >= self.hedge_at:
+            self.hedged = True
+            start_hedge()
+        if self.retry_at is not None and now >= self.retry_at:
+            self.retry_at = None
+            start_primary()
+
+    def on_error(self, error):
+        """An attempt failed; schedule a retry or give up"""
+        self.in_flight -= 1
+        self.last_error = error
+        if self.in_flight > 0:
+            # Another attempt (the primary or the hedge) can still answer; a retry
+            # now would only pay for a third request running alongside it
+            return
+        if self.retryable(error) and self.attempts <= self.policy.retries:
+            if self.retry_at is None:
+                self.retry_at = time.monotonic() + self.policy.backoff_delay(self.attempts)
+        elif self.retry_at is None:
+            raise error
+
+
+def call_with_deadline(policy, primary, hedge=None, retryable=None):
+    """Return the first successful result of `primary(timeout)` (or `hedge(timeout)`) within the budget
+
+    Both callables get the seconds left and should use it as their own
+    timeout. Raises DeadlineExceeded when the budget runs out, or the last
+    error once it is not retryable or the retries are used up.
+    """
+    state = _Attempts(policy, primary, hedge, retryable)
+
+    def run(func):
+        def target(timeout, label):
+            try:
+                with span("gemini_attempt", kind=label):
+                    result = func(timeout)
+                state.results.put((label, True, result))
+            except Exception as e:
+                state.results.put((label, False, e))
+        return target
+
+    def start_primary():
+        state.attempts += 1
+        state.launch(run(primary), "primary" if state.attempts == 1 else "retry")
+
+    def start_hedge():
+        print("Gemini is slow; sending a hedged request")
+        state.launch(run(hedge), "hedge")
+
+    start_primary()
+    while True:
+        try:
+            label, ok, value = state.results.get(timeout=state.wait_time())
+        except queue.Empty:
+            state.on_idle(start_primary, start_hedge)
+            continue
+        if ok:
+            if label == "hedge":
+                print("Hedged request answered first")
+            return value
+        print(f"Gemini {label} attempt failed: {value}")
+        state.on_error(value)
+
+
+def stream_with_deadline(policy, primary, hedge=None, retryable=None, chunk_timeout=None):
+    """Yield chunks from whichever stream produces text first, within the budget
+
+    `primary(timeout)` and `hedge(timeout)` return iterators of text. The
+    budget, retries and hedging apply until the first chunk; once a stream has
+    produced text it is the only one read, and any other is cancelled. After
+    that each chunk must arrive within `chunk_timeout` (default: the budget).
+    """
+    state = _Attempts(policy, primary, hedge, retryable)
+    cancelled = {}
+
+    def run(func):
+        def target(timeout, label):
+            cancel = cancelled[label]
+            try:
+                with span("gemini_attempt", kind=label.split(":")[0], stream=True):
+                    stream = func(timeout)
+                    try:
+                        for chunk in stream:
+                            if cancel.is_set():
+                                break
+                            state.results.put((label, "chunk", chunk))
+                    finally:
+                        close = getattr(stream, "close", None)
+                        if close:
+                            close()
+                state.results.put((label, "done", None))
+            except Exception as e:
+                state.results.put((label, "error", e))
+        return target
+
+    def start(func, kind):
+        label = f"{kind}:{state.attempts}"
+        cancelled[label] = threading.Event()
+        state.launch(run(func), label)
+
+    def start_primary():
+        state.attempts += 1
+        start(primary, "primary" if state.attempts == 1 else "retry")
+
+    def start_hedge():
+        print("Gemini is slow; sending a hedged request")
+        start(hedge, "hedge")
+
+    # Until the first chunk: retries and hedging
+    start_primary()
+    while True:
+        try:
+            label, kind, value = state.results.get(timeout=state.wait_time())
+        except queue.Empty:
+            state.on_idle(start_primary, start_hedge)
+            continue
+        if kind == "chunk":
+            winner = label
+            break
+        if kind == "done":
+            # Finished without any text; nothing to retry
+            state.in_flight -= 1
+            if state.in_flight == 0 and state.retry_at is None:
+                return
+            continue
+        print(f"Gemini {label.split(':')[0]} stream failed: {value}")
+        state.on_error(value)
+
+    if winner.startswith("hedge"):
+        print("Hedged request answered first")
+    for label, cancel in cancelled.items():
+        if label != winner:
+            cancel.set()
+
+    chunk_timeout = chunk_timeout or policy.budget
+    try:
+        yield value
+        while True:
+            try:
+                label, kind, value = state.results.get(timeout=chunk_timeout)
+            except queue.Empty:
+                raise DeadlineExceeded(f"Answer stream stalled for {chunk_timeout:.1f}s")
+            if label != winner:
+                continue
+            if kind == "chunk":
+                yield value
+            elif kind == "done":
+                return
+            else:
+                raise value
+    finally:
+        # The caller stopped reading (or failed): stop the stream too
+        cancelled[winner].set()
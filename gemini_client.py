@@ -0,0 +1,208 @@
+import http.client
+import json
+import os
+import queue
+import socket
+import threading
+from urllib.parse import urlsplit
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com"
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+# Errors that mean a pooled keep-alive connection went stale and can be retried
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                           BrokenPipeError, ConnectionResetError)
+
+
+# Statuses worth retrying: rate limiting and server-side trouble
+RETRYABLE_STATUSES = (408, 429, 500, 502, 503, 504)
+
+
+class GeminiError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def is_retryable(error):
+    """Timeouts, dropped connections and 429/5xx are worth another attempt; bad requests are not"""
+    if isinstance(error, GeminiError):
+        return error.status in RETRYABLE_STATUSES
+    return isinstance(error, (socket.timeout, OSError, http.client.HTTPException))
+
+
+# google.api_core exceptions for the same statuses, matched by name so the SDK isn't imported here
+RETRYABLE_SDK_ERRORS = ("ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+                        "GatewayTimeout", "InternalServerError", "BadGateway", "RetryError")
+
+
+def is_retryable_sdk(error):
+    """is_retryable for errors raised by the google-generativeai SDK: 400/403 and blocked prompts fail at once"""
+    if type(error).__name__ in RETRYABLE_SDK_ERRORS:
+        return True
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUSES
+    return is_retryable(error)
+
+
+def build_payload(prompt):
+    return {
+        "contents": [{
+            "parts": [{
+                "text": prompt
+            }]
+        }]
+    }
+
+
+def extract_text(response_data):
+    """Pull the answer text out of a generateContent response"""
+    candidates = response_data.get("candidates") or [{}]
+    parts = candidates[0].get("content", {}).get("parts") or [{}]
+    return "".join(part.get("text", "") for part in parts)
+
+
+class GeminiClient:
+    """Gemini REST client that reuses keep-alive HTTPS connections between requests"""
+
+    def __init__(self, api_key, model=DEFAULT_MODEL, base_url=None, pool_size=4,
+                 connect_timeout=5.0, read_timeout=30.0):
+        self.api_key = api_key
+        self.model = model
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        # GEMINI_BASE_URL lets the client talk to a local stand-in server
+        url = urlsplit(base_url or os.getenv("GEMINI_BASE_URL") or DEFAULT_BASE_URL)
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        self.base_path = url.path.rstrip("/")
+
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _new_connection(self, timeout=None):
+        connect_timeout = min(self.connect_timeout, timeout) if timeout else self.connect_timeout
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=connect_timeout)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=connect_timeout)
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+        return conn
+
+    def _acquire(self, timeout=None):
+        try:
+            conn, reused = self._pool.get_nowait(), True
+        except queue.Empty:
+            conn, reused = self._new_connection(timeout), False
+        # A per-call timeout (what is left of the question's budget) caps the read timeout
+        conn.sock.settimeout(min(self.read_timeout, timeout) if timeout else self.read_timeout)
+        return conn, reused
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def prewarm(self, connections=1):
+        """Open connections (TCP + TLS handshake) ahead of the first question"""
+        for _ in range(min(connections, self.pool_size)):
+            try:
+                self._release(self._new_connection())
+            except Exception as e:
+                print(f"Error pre-warming Gemini connection: {e}")
+                return False
+        return True
+
+    def prewarm_async(self, connections=1):
+        thread = threading.Thread(target=self.prewarm, args=(connections,))
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _path(self, method, model=None):
+        return f"{self.base_path}/v1beta/models/{model or self.model}:{method}"
+
+    def _headers(self):
+        return {
+            "Content-Type": "application/json",
+            "x-goog-api-key": self.api_key,
+        }
+
+    def _send(self, path, body, timeout=None):
+        """Send a POST and return (connection, response), retrying once on a stale connection"""
+        for attempt in range(2):
+            conn, reused = self._acquire(timeout)
+            try:
+                conn.request("POST", path, body=body, headers=self._headers())
+                return conn, conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                if not reused or attempt:
+                    raise
+            except Exception:
+                conn.close()
+                raise
+
+    def generate_content(self, payload, model=None, timeout=None):
+        """POST generateContent straight from memory and return the decoded JSON"""
+        body = json.dumps(payload).encode("utf-8")
+        conn, response = self._send(self._path("generateContent", model), body, timeout)
+        try:
+            data = response.read()
+        except Exception:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+
+        if response.status != 200:
+            raise GeminiError(f"HTTP {response.status}: {data.decode('utf-8', 'replace')[:500]}",
+                              response.status)
+        return json.loads(data)
+
+    def generate(self, prompt, model=None, timeout=None):
+        return extract_text(self.generate_content(build_payload(prompt), model, timeout))
+
+    def stream_generate_content(self, payload, model=None, timeout=None):
+        """POST streamGenerateContent and yield each decoded server-sent event"""
+        body = json.dumps(payload).encode("utf-8")
+        conn, response = self._send(self._path("streamGenerateContent", model) + "?alt=sse", body, timeout)
+        complete = False
+        try:
+            if response.status != 200:
+                data = response.read()
+                raise GeminiError(f"HTTP {response.status}: {data.decode('utf-8', 'replace')[:500]}",
+                                  response.status)
+            for line in response:
+                line = line.strip()
+                if line.startswith(b"data:"):
+                    yield json.loads(line[5:])
+            complete = True
+        finally:
+            # A half-read response can't be reused, e.g. when the caller stops early
+            if complete and not response.will_close:
+                self._release(conn)
+            else:
+                conn.close()
+
+    def stream_generate(self, prompt, model=None, timeout=None):
+        """Yield the answer text in pieces as the model produces it"""
+        for event in self.stream_generate_content(build_payload(prompt), model, timeout):
+            text = extract_text(event)
+            if text:
+                yield text
@@ -1,16 +1,27 @@
+from startup import lazy_import, mark, startup_report, warm_imports
 import os
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog
-import json
 import threading
 import time
-import subprocess
-import tempfile
-import pyaudio
-import wave
-import speech_recognition as sr
-import sounddevice as sd
-import numpy as np
+from dotenv import load_dotenv
+from audio_writer import StreamingWriter
+from audio_format import SPEECH_RATE, CaptureFormat
+from answer_cache import AnswerCache
+from transcriber import create_transcriber
+from interview_engine import ResumeAnswerer
+from question_detector import QuestionDetector
+from session_store import SessionStore
+from session_search import SessionSearch
+from tracing import export_on_exit, span, traced, tracer
+from trace_panel import TracePanel
+
+# Audio libraries are slow to import; they load in the background after the window is drawn
+pyaudio = lazy_import('pyaudio')
+sd = lazy_import('sounddevice')
+
+# Load environment variables (TRANSCRIBER, VOSK_MODEL_PATH, GEMINI_*) from .env
+load_dotenv()
 
 # Create directory for any temporary files
 os.makedirs("temp", exist_ok=True)
@@ -25,19 +36,47 @@ class InterviewAssistant:
         # Audio recording variables
         self.is_recording = False
         self.audio_thread = None
-        self.audio_file = "temp/interview_audio.wav"
+        self.audio_file = "temp/interview_audio.flac"
         self.recording_type = "mic"  # Default to microphone recording
         
+        # Speech-to-text engine, chosen with the TRANSCRIBER environment variable
+        self.transcriber = create_transcriber(fallback="google")
+        self.live_stream = None
+        
         # Resume variables
         self.resume_content = ""
         self.has_resume = False
         
+        # Prompting, caching and the Gemini connection live in the UI-free answerer;
+        # answers to questions already asked are kept in memory and on disk
+        self.answerer = ResumeAnswerer(cache=AnswerCache("temp/answer_cache.sqlite3"))
+        self.detector = QuestionDetector()
+        # Every answered question is saved in the background and can be searched with F3
+        self.store = SessionStore("temp/sessions.sqlite3")
+        
         # Main container
         self.main_frame = ttk.Frame(self.root, padding=20)
         self.main_frame.pack(fill=tk.BOTH, expand=True)
         
         # Setup UI components
         self.setup_ui()
+        
+        # Stage timings, toggled with F12 (or shown at startup with TRACE_PANEL=1)
+        self.trace_panel = TracePanel(self.root, "temp/trace.json")
+        self.root.bind('<F12>', self.trace_panel.toggle)
+        if os.getenv('TRACE_PANEL'):
+            self.root.after_idle(self.trace_panel.show)
+        self.session_search = SessionSearch(self.root, self.store)
+        self.root.bind('<F3>', self.session_search.toggle)
+        
+        # Everything slow happens once the window is on screen
+        self.root.after_idle(self.finish_startup)
+    
+    def finish_startup(self):
+        mark("window drawn")
+        startup_report("interview_assistant", log_file="temp/startup_times.jsonl")
+        warm_imports(pyaudio, sd)
+        self.transcriber.warm_up_async()
     
     def setup_ui(self):
         # Title
@@ -59,6 +98,7 @@ class InterviewAssistant:
                 if saved_key:
                     self.api_entry.insert(0, saved_key)
                     self.api_key = saved_key
+                    self.reset_gemini_client()
         
         save_button = ttk.Button(api_frame, text="Save Key", command=self.save_api_key)
         save_button.pack(side=tk.RIGHT, padx=5)
@@ -202,6 +242,7 @@ class InterviewAssistant:
                 return
                 
             self.has_resume = True
+            self.answerer.load_resume(self.resume_content)
             self.resume_status_var.set(f"Resume uploaded: {os.path.basename(file_path)}")
             self.view_resume_button.configure(state="normal")
             self.status_var.set("Resume uploaded successfully!")
@@ -252,6 +293,7 @@ class InterviewAssistant:
         self.audio_thread.daemon = True
         self.audio_thread.start()
     
+    @traced("stop_recording")
     def stop_recording(self):
         self.is_recording = False
         self.record_button.configure(text="Start Recording")
@@ -268,22 +310,37 @@ class InterviewAssistant:
     
     def auto_process_audio(self):
         try:
+            # Most of the audio was transcribed while recording; only the tail is left
+            text = ""
+            if self.live_stream is not None:
+                try:
+                    with span("transcribe", engine=self.transcriber.name, live=True):
+                        text = self.live_stream.finish()
+                except Exception as e:
+                    print(f"Live transcription failed, transcribing the file instead: {e}")
+                self.live_stream = None
+            
             # Transcribe audio
-            recognizer = sr.Recognizer()
-            with sr.AudioFile(self.audio_file) as source:
-                audio_data = recognizer.record(source)
-                text = recognizer.recognize_google(audio_data)
-                
-                # Update the question field with the transcribed text
-                self.root.after(0, lambda: self.update_question_field_and_answer(text))
+            if not text:
+                with span("transcribe", engine=self.transcriber.name, live=False):
+                    text = self.transcriber.transcribe(self.audio_file)
+            
+            # Update the question field with the transcribed text
+            self.root.after(0, lambda: self.update_question_field_and_answer(text))
         except Exception as e:
             error_msg = str(e)
             self.root.after(0, lambda: self.show_error(f"Transcription error: {error_msg}"))
     
     def update_question_field_and_answer(self, text):
+        # Only the question itself is sent; small talk around it is dropped
+        question = self.detector.extract(text)
+        
         # Update question field
         self.question_text.delete(1.0, tk.END)
-        self.question_text.insert(tk.END, text)
+        self.question_text.insert(tk.END, question or text)
+        if question is None:
+            self.status_var.set("No question detected. Edit the text and click Get Answer to ask anyway.")
+            return
         self.status_var.set("Audio transcribed. Generating answer...")
         
         # Automatically get answer
@@ -292,7 +349,7 @@ class InterviewAssistant:
             return
         
         # Start a new thread to get the answer
-        thread = threading.Thread(target=self.process_question, args=(text,))
+        thread = threading.Thread(target=self.process_question, args=(question, text))
         thread.daemon = True
         thread.start()
     
@@ -309,6 +366,11 @@ class InterviewAssistant:
         RATE = 44100
         
         p = pyaudio.PyAudio()
+        # Chunks are packed to 16 kHz int16 and go straight to disk, so long
+        # interviews don't accumulate in memory and STT gets its native format
+        capture_format = CaptureFormat(RATE, SPEECH_RATE)
+        writer = StreamingWriter(self.audio_file, SPEECH_RATE, channels=CHANNELS).start()
+        self.live_stream = self.start_live_transcription(SPEECH_RATE)
         
         try:
             stream = p.open(format=FORMAT,
@@ -317,32 +379,33 @@ class InterviewAssistant:
                             input=True,
                             frames_per_buffer=CHUNK)
             
-            frames = []
-            
             while self.is_recording:
-                data = stream.read(CHUNK)
-                frames.append(data)
+                data = capture_format.process(stream.read(CHUNK))
+                writer.write(data)
+                if self.live_stream:
+                    self.live_stream.feed(data)
             
             stream.stop_stream()
             stream.close()
             p.terminate()
-            
-            # Save the recorded audio to a WAV file
-            wf = wave.open(self.audio_file, 'wb')
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(p.get_sample_size(FORMAT))
-            wf.setframerate(RATE)
-            wf.writeframes(b''.join(frames))
-            wf.close()
+            writer.close()
+            if writer.error:
+                raise writer.error
         except Exception as e:
             p.terminate()
-            self.root.after(0, lambda: self.show_error(f"Recording error: {str(e)}"))
+            writer.close()
+            error_msg = str(e)
+            self.root.after(0, lambda: self.show_error(f"Recording error: {error_msg}"))
     
     def record_system_audio(self):
         CHANNELS = 1
         RATE = 44100
         CHUNK = 1024
         
+        capture_format = CaptureFormat(RATE, SPEECH_RATE)
+        writer = StreamingWriter(self.audio_file, SPEECH_RATE, channels=CHANNELS).start()
+        self.live_stream = self.start_live_transcription(SPEECH_RATE)
+        
         try:
             # Get the default output device
             device_info = sd.query_devices(kind='output')
@@ -353,23 +416,42 @@ class InterviewAssistant:
                 if status:
                     print(status)
                 if self.is_recording:
-                    frames.append(indata.copy())
+                    data = capture_format.process(indata)
+                    writer.write(data)
+                    if self.live_stream:
+                        self.live_stream.feed(data)
             
             # Start recording
-            frames = []
             with sd.InputStream(device=device_id, channels=CHANNELS, samplerate=RATE,
                               callback=callback, blocksize=CHUNK):
                 while self.is_recording:
                     sd.sleep(100)
             
-            # Convert frames to a single numpy array
-            audio_data = np.concatenate(frames, axis=0)
-            
-            # Save to WAV file
-            sd.write(self.audio_file, audio_data, RATE)
+            writer.close()
+            if writer.error:
+                raise writer.error
             
         except Exception as e:
-            self.root.after(0, lambda: self.show_error(f"System audio recording error: {str(e)}"))
+            writer.close()
+            error_msg = str(e)
+            self.root.after(0, lambda: self.show_error(f"System audio recording error: {error_msg}"))
+    
+    def start_live_transcription(self, rate):
+        try:
+            return self.transcriber.start_stream(rate, on_partial=self.on_partial_transcript)
+        except Exception as e:
+            print(f"Live transcription unavailable: {e}")
+            return None
+    
+    def on_partial_transcript(self, text):
+        # Called from the transcription worker while recording is still going
+        self.root.after(0, lambda: self.show_partial_transcript(text))
+    
+    def show_partial_transcript(self, text):
+        if not self.is_recording and self.live_stream is None:
+            return
+        self.question_text.delete(1.0, tk.END)
+        self.question_text.insert(tk.END, text)
     
     def transcribe_audio(self):
         self.status_var.set("Transcribing audio...")
@@ -382,13 +464,10 @@ class InterviewAssistant:
     
     def process_audio(self):
         try:
-            recognizer = sr.Recognizer()
-            with sr.AudioFile(self.audio_file) as source:
-                audio_data = recognizer.record(source)
-                text = recognizer.recognize_google(audio_data)
-                
-                # Update the question field with the transcribed text
-                self.root.after(0, lambda: self.update_question_field(text))
+            text = self.transcriber.transcribe(self.audio_file)
+            
+            # Update the question field with the transcribed text
+            self.root.after(0, lambda: self.update_question_field(text))
         except Exception as e:
             error_msg = str(e)
             self.root.after(0, lambda: self.show_error(f"Transcription error: {error_msg}"))
@@ -405,10 +484,14 @@ class InterviewAssistant:
             self.api_key = key
             with open("api_key.txt", "w") as f:
                 f.write(key)
+            self.reset_gemini_client()
             self.status_var.set("API key saved successfully")
         else:
             self.status_var.set("Please enter an API key first")
     
+    def reset_gemini_client(self):
+        self.answerer.set_api_key(self.api_key)
+    
     def clear_fields(self):
         self.question_text.delete(1.0, tk.END)
         self.answer_text.delete(1.0, tk.END)
@@ -432,94 +515,70 @@ class InterviewAssistant:
         thread.daemon = True
         thread.start()
     
-    def process_question(self, question):
+    def process_question(self, question, transcript=None):
         try:
-            # Call Gemini API for the answer
-            answer = self.call_gemini_api(question)
+            # Stream the answer so it starts appearing after the first chunk;
+            # a cached answer arrives as a single chunk
+            self.root.after(0, self.begin_answer)
+            chunks = []
+            started = time.perf_counter()
+            first_chunk_ms = None
+            for chunk in self.stream_gemini_api(question):
+                if not chunks:
+                    tracer.record("first_chunk", started)
+                    first_chunk_ms = (time.perf_counter() - started) * 1000
+                chunks.append(chunk)
+                self.root.after(0, lambda c=chunk: self.append_answer(c))
             
-            # Update UI in the main thread
-            self.root.after(0, lambda: self.update_answer(answer))
+            if chunks:
+                self.root.after(0, self.finish_answer)
+                self.store.record(transcript=transcript, question=question, answer="".join(chunks),
+                                  source="assistant", first_chunk_ms=first_chunk_ms,
+                                  answer_ms=(time.perf_counter() - started) * 1000,
+                                  resume_hash=self.answerer.resume_hash)
+            else:
+                self.root.after(0, lambda: self.update_answer("Sorry, couldn't generate a response. Please try again."))
         except Exception as e:
             error_msg = str(e)
             self.root.after(0, lambda: self.show_error(error_msg))
     
+    def build_prompt(self, question):
+        return self.answerer.build_prompt(question)
+    
+    def stream_gemini_api(self, question):
+        """Yield the answer text in chunks as Gemini produces it"""
+        return self.answerer.stream_interview_response(question)
+    
     def call_gemini_api(self, question):
-        # Create payload for the API
-        prompt = f"""You are an interview coach helping with job interviews.
-For this question: "{question}"
-Provide a concise, professional answer that would impress an interviewer.
-Your answer should be direct, highlight relevant skills, and show confidence.
-Keep it to 3-5 sentences maximum."""
-
-        # Include resume information if available
-        if self.has_resume:
-            prompt = f"""You are an interview coach helping with job interviews.
-Here is the candidate's resume information:
-{self.resume_content}
-
-For this question: "{question}"
-Provide a concise, professional answer that would impress an interviewer.
-Your answer should be direct, highlight relevant skills from the resume, and show confidence.
-Tailor the response to emphasize relevant experience and qualifications from the resume.
-Keep it to 3-5 sentences maximum."""
-
-        payload = {
-            "contents": [{
-                "parts":[{
-                    "text": prompt
-                }]
-            }]
-        }
-        
-        # Save payload to a temporary file
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as temp_file:
-            json.dump(payload, temp_file)
-            payload_file = temp_file.name
-        
-        try:
-            # Construct the curl command
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={self.api_key}"
-            
-            # Run the curl command
-            result = subprocess.run([
-                'curl',
-                url,
-                '-H', 'Content-Type: application/json',
-                '-X', 'POST',
-                '-d', '@' + payload_file
-            ], capture_output=True, text=True, check=True)
-            
-            # Clean up the temporary file
-            os.unlink(payload_file)
-            
-            # Process the response
-            if result.returncode != 0:
-                return f"Error executing API request: {result.stderr}"
-            
-            try:
-                response_data = json.loads(result.stdout)
-                answer = response_data.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
-                if not answer:
-                    return "Sorry, couldn't generate a response. Please try again."
-                return answer
-            except (json.JSONDecodeError, KeyError, IndexError) as e:
-                return f"Error processing response: {str(e)}"
-        except subprocess.CalledProcessError as e:
-            return f"API Error: {e.stderr}"
-        except Exception as e:
-            return f"Unexpected error: {str(e)}"
+        return self.answerer.get_interview_response(question)
     
+    @traced("ui_update")
     def update_answer(self, answer):
         self.answer_text.delete(1.0, tk.END)
         self.answer_text.insert(tk.END, answer)
         self.status_var.set("Answer ready!")
         self.submit_button.configure(state="normal")
     
+    def begin_answer(self):
+        self.answer_text.delete(1.0, tk.END)
+    
+    @traced("ui_update")
+    def append_answer(self, chunk):
+        self.answer_text.insert(tk.END, chunk)
+        self.answer_text.see(tk.END)
+    
+    @traced("ui_update")
+    def finish_answer(self):
+        self.status_var.set("Answer ready!")
+        self.submit_button.configure(state="normal")
+    
     def show_error(self, error_msg):
         self.status_var.set(f"Error: {error_msg}")
         self.submit_button.configure(state="normal")
 
 if __name__ == "__main__":
+    # Write stage timings on exit when TRACE_FILE is set
+    export_on_exit()
     root = tk.Tk()
     app = InterviewAssistant(root)
     root.mainloop() 
\ No newline at end of file
@@ -0,0 +1,796 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dotenv import load_dotenv
+from startup import lazy_import
+from audio_format import SPEECH_RATE
+from capture_session import CaptureSession
+from pipeline import BoundedQueue, Pipeline
+from gemini_client import GeminiClient, GeminiError, build_payload, extract_text, is_retryable, is_retryable_sdk
+from deadline import CallPolicy, DeadlineExceeded, call_with_deadline, stream_with_deadline
+from answer_cache import AnswerCache, fingerprint
+from resume_index import ResumeIndex, estimate_tokens
+from conversation import ConversationContext, clip
+from transcriber import Transcriber, create_transcriber
+from tracing import export_on_exit, span, tracer
+from transcript_gate import TranscriptGate
+from speculative import SpeculativeAnswer, same_question
+from question_detector import QuestionDetector
+from session_store import DEFAULT_PATH as SESSIONS_FILE, SessionStore
+from vad import SpeechSegmenter
+
+genai = lazy_import('google.generativeai')
+
+# Create temp directory if it doesn't exist
+TEMP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp')
+os.makedirs(TEMP_DIR, exist_ok=True)
+
+
+def has_api_key(api_key):
+    return bool(api_key) and api_key != 'your_gemini_api_key_here'
+
+
+class GeminiAPI:
+    # Bump when the prompt changes so cached answers from the old prompt are not reused
+    PROMPT_VERSION = 2
+    # The question always gets at least this many tokens, whatever the prompt budget
+    QUESTION_MIN_TOKENS = 100
+
+    def __init__(self, simulated=False, policy=None, context=None, prompt_tokens=None):
+        self.api_key = os.getenv('GEMINI_API_KEY')
+        self.is_simulated = simulated
+        self.cache = AnswerCache(os.path.join(TEMP_DIR, 'answer_cache.sqlite3'))
+        # Time budget, retries and optional hedging for each question
+        self.policy = policy or CallPolicy.from_env()
+        # Earlier questions and answers (a ConversationContext), fitted into a fixed prompt size
+        self.context = context
+        if prompt_tokens is None:
+            try:
+                prompt_tokens = int(os.getenv("GEMINI_PROMPT_TOKENS", "1000"))
+            except ValueError:
+                print(f"Invalid GEMINI_PROMPT_TOKENS {os.getenv('GEMINI_PROMPT_TOKENS')!r}; using 1000")
+                prompt_tokens = 1000
+        template_tokens = estimate_tokens(self._prompt("", ""))
+        if prompt_tokens < template_tokens + self.QUESTION_MIN_TOKENS:
+            print(f"Prompt budget of {prompt_tokens} tokens leaves no room for the question; "
+                  f"using {template_tokens + self.QUESTION_MIN_TOKENS}")
+            prompt_tokens = template_tokens + self.QUESTION_MIN_TOKENS
+        self.prompt_tokens = prompt_tokens
+
+        self.model = None
+        self.hedge_model = None
+        self._model_lock = threading.Lock()
+
+        if not simulated and not has_api_key(self.api_key):
+            print("No Gemini API key found. Using simulated responses.")
+            self.is_simulated = True
+
+    def load_model(self):
+        """Import and configure the SDK on first use rather than at startup"""
+        with self._model_lock:
+            if self.model is None and not self.is_simulated:
+                options = {}
+                base_url = os.getenv("GEMINI_BASE_URL")
+                if base_url:
+                    # Local stand-in server (see benchmark.py), reached over plain REST
+                    options = {"transport": "rest", "client_options": {"api_endpoint": base_url}}
+                try:
+                    genai.configure(api_key=self.api_key, **options)
+                    self.model = genai.GenerativeModel('gemini-pro')
+                    if self.policy.hedge_model:
+                        self.hedge_model = genai.GenerativeModel(self.policy.hedge_model)
+                    print("Gemini API initialized successfully")
+                except Exception as e:
+                    print(f"Error initializing Gemini API: {e}")
+                    self.is_simulated = True
+        return self.model
+
+    def remember(self, question, answer):
+        """Add a finished exchange to the conversation context"""
+        if self.context is not None:
+            self.context.add_turn(question, answer)
+
+    def _use_cache(self, text):
+        # A follow-up ("why did you choose that?") depends on the conversation, not just its words
+        return self.context is None or not self.context.is_follow_up(text)
+
+    def _build_prompt(self, text):
+        """The prompt for `text` within `prompt_tokens`: the question first, then as much context as fits"""
+        room = max(self.QUESTION_MIN_TOKENS, self.prompt_tokens - estimate_tokens(self._prompt("", "")))
+        text = clip(text, room, keep="end")
+        context = ""
+        if self.context is not None:
+            context = self.context.render(self.prompt_tokens - estimate_tokens(self._prompt(text, "")))
+        return self._prompt(text, context)
+
+    def _prompt(self, text, context):
+        if context:
+            context = f"""
+Earlier in this interview (use it to understand follow-up questions; answer only the interview text below):
+\"\"\"
+{context}
+\"\"\"
+"""
+        return f"""
+You are an expert interview coach. Based on the following interview question or conversation,
+provide a concise, professional response that would impress the interviewer.
+
+If the text contains multiple speakers or a back-and-forth conversation, identify the most recent question
+or topic that needs addressing.
+{context}
+Interview text:
+\"\"\"
+{text}
+\"\"\"
+
+Provide a response that demonstrates:
+1. Clear understanding of the question/topic
+2. Relevant experience and knowledge
+3. Structured thinking
+4. Positive attitude
+
+Keep your response concise (3-5 sentences) but impactful. Focus on key points that would make the candidate stand out.
+"""
+
+    def get_interview_response(self, text):
+        if not text:
+            return "Please provide interview text to analyze."
+
+        if self.is_simulated or self.load_model() is None:
+            return self._get_simulated_response(text)
+
+        use_cache = self._use_cache(text)
+        cached = self.cache.get(text, version=self.PROMPT_VERSION) if use_cache else None
+        if cached is not None:
+            print("Using cached response")
+            return cached
+
+        try:
+            with span("build_prompt") as prompt_span:
+                prompt = self._build_prompt(text)
+                prompt_span.args["tokens"] = estimate_tokens(prompt)
+
+            print("Sending request to Gemini API...")
+            # The SDK has no per-request timeout; a call past the budget is abandoned
+            with span("gemini_call", stream=False):
+                answer = call_with_deadline(
+                    self.policy,
+                    lambda timeout: self.model.generate_content(prompt).text,
+                    lambda timeout: self.hedge_model.generate_content(prompt).text,
+                    retryable=is_retryable_sdk)
+            print("Response received from Gemini API")
+            if use_cache:
+                self.cache.put(text, answer, version=self.PROMPT_VERSION)
+            return answer
+        except DeadlineExceeded as e:
+            print(f"Gemini API timed out: {e}")
+            return f"API Error: {str(e)}"
+        except Exception as e:
+            print(f"Error with Gemini API: {e}")
+            return f"API Error: {str(e)}"
+
+    def _sdk_stream(self, model, prompt):
+        for chunk in model.generate_content(prompt, stream=True):
+            if chunk.text:
+                yield chunk.text
+
+    def stream_interview_response(self, text):
+        """Yield the response in pieces as Gemini generates it"""
+        if not text:
+            yield "Please provide interview text to analyze."
+            return
+
+        if self.is_simulated or self.load_model() is None:
+            for word in self._get_simulated_response(text).split(" "):
+                yield word + " "
+            return
+
+        use_cache = self._use_cache(text)
+        cached = self.cache.get(text, version=self.PROMPT_VERSION) if use_cache else None
+        if cached is not None:
+            print("Using cached response")
+            yield cached
+            return
+
+        with span("build_prompt") as prompt_span:
+            prompt = self._build_prompt(text)
+            prompt_span.args["tokens"] = estimate_tokens(prompt)
+        print("Streaming request to Gemini API...")
+        # Failures and timeouts are raised to the caller rather than replaced with a
+        # canned answer. The span also covers the time the caller spends on each chunk.
+        chunks = []
+        with span("gemini_call", stream=True):
+            for chunk in stream_with_deadline(
+                    self.policy,
+                    lambda timeout: self._sdk_stream(self.model, prompt),
+                    lambda timeout: self._sdk_stream(self.hedge_model, prompt),
+                    retryable=is_retryable_sdk):
+                chunks.append(chunk)
+                yield chunk
+        print("Response stream from Gemini API finished")
+        if chunks and use_cache:
+            self.cache.put(text, "".join(chunks), version=self.PROMPT_VERSION)
+
+    def _get_simulated_response(self, text):
+        print("Using simulated response")
+        responses = [
+            "I've successfully handled similar challenges by implementing a structured approach that focuses on prioritization, clear communication, and regular progress tracking. My experience has taught me the importance of both technical excellence and collaborative teamwork to ensure optimal results.",
+
+            "My approach to problem-solving combines analytical thinking with creative solutions. I first break down complex issues into manageable components, then systematically address each while maintaining a holistic view. This methodology has consistently delivered successful outcomes in my previous roles.",
+
+            "I believe effective leadership comes from a combination of clear vision, empathetic communication, and leading by example. Throughout my career, I've found that empowering team members while providing appropriate guidance creates an environment where innovation and productivity flourish naturally.",
+
+            "Based on my experience with similar projects, I would approach this by first establishing clear requirements and success metrics, then developing a phased implementation plan with built-in feedback loops. This ensures we can deliver value quickly while remaining adaptable to changing needs.",
+
+            "Technical challenges often require both depth of expertise and breadth of perspective. I've cultivated both through continuous learning and collaborative work across disciplines. This balanced approach has proven effective when tackling complex problems that require innovative solutions."
+        ]
+
+        # Simple selection based on text length
+        index = len(text) % len(responses)
+        return responses[index]
+
+
+class ResumeAnswerer:
+    """Resume-aware answers through the pooled Gemini REST client"""
+
+    # Bump when the prompt changes so cached answers from the old prompt are not reused
+    PROMPT_VERSION = 2
+
+    # How much of the resume goes into each prompt
+    RESUME_TOP_K = 6
+    RESUME_TOKEN_BUDGET = 600
+
+    def __init__(self, api_key=None, cache=None, pool_size=4, policy=None):
+        self.cache = cache or AnswerCache(os.path.join(TEMP_DIR, 'answer_cache.sqlite3'))
+        self.pool_size = pool_size
+        # Time budget, retries and optional hedging for each question
+        self.policy = policy or CallPolicy.from_env()
+        self.client = None
+        self.resume_hash = ""
+        self.resume_index = None
+        if api_key:
+            self.set_api_key(api_key)
+
+    @property
+    def has_resume(self):
+        return self.resume_index is not None
+
+    def set_api_key(self, api_key):
+        if self.client:
+            self.client.close()
+        self.client = GeminiClient(api_key, pool_size=self.pool_size)
+        # Do the TLS handshake now rather than on the first question
+        self.client.prewarm_async()
+
+    def load_resume(self, text):
+        self.resume_hash = fingerprint(text)
+        # Parse once; each question then only pulls the relevant chunks
+        self.resume_index = ResumeIndex(text)
+
+    def build_prompt(self, question):
+        prompt = f"""You are an interview coach helping with job interviews.
+For this question: "{question}"
+Provide a concise, professional answer that would impress an interviewer.
+Your answer should be direct, highlight relevant skills, and show confidence.
+Keep it to 3-5 sentences maximum."""
+
+        # Include resume information if available
+        if self.has_resume:
+            resume_context = self.resume_index.context_for(question, self.RESUME_TOP_K, self.RESUME_TOKEN_BUDGET)
+            prompt = f"""You are an interview coach helping with job interviews.
+Here are the parts of the candidate's resume most relevant to the question:
+{resume_context}
+
+For this question: "{question}"
+Provide a concise, professional answer that would impress an interviewer.
+Your answer should be direct, highlight relevant skills from the resume, and show confidence.
+Tailor the response to emphasize relevant experience and qualifications from the resume.
+Keep it to 3-5 sentences maximum."""
+        return prompt
+
+    def _require_client(self):
+        if self.client is None:
+            raise GeminiError("No Gemini API key set")
+        return self.client
+
+    def get_interview_response(self, question):
+        cached = self.cache.get(question, self.resume_hash, self.PROMPT_VERSION)
+        if cached is not None:
+            return cached
+
+        # Create payload for the API
+        with span("build_prompt"):
+            prompt = self.build_prompt(question)
+
+        try:
+            # The pooled client keeps the connection open between questions
+            client = self._require_client()
+            payload = build_payload(prompt)
+            with span("gemini_call", stream=False):
+                response_data = call_with_deadline(
+                    self.policy,
+                    lambda timeout: client.generate_content(payload, timeout=timeout),
+                    lambda timeout: client.generate_content(payload, self.policy.hedge_model, timeout),
+                    retryable=is_retryable)
+            answer = extract_text(response_data)
+            if not answer:
+                return "Sorry, couldn't generate a response. Please try again."
+            self.cache.put(question, answer, self.resume_hash, self.PROMPT_VERSION)
+            return answer
+        except (json.JSONDecodeError, KeyError, IndexError) as e:
+            return f"Error processing response: {str(e)}"
+        except (GeminiError, DeadlineExceeded) as e:
+            return f"API Error: {str(e)}"
+        except Exception as e:
+            return f"Unexpected error: {str(e)}"
+
+    def stream_interview_response(self, question):
+        """Yield the answer text in chunks as Gemini produces it"""
+        cached = self.cache.get(question, self.resume_hash, self.PROMPT_VERSION)
+        if cached is not None:
+            yield cached
+            return
+
+        with span("build_prompt"):
+            prompt = self.build_prompt(question)
+        client = self._require_client()
+        chunks = []
+        # The span also covers the time the caller spends on each chunk
+        with span("gemini_call", stream=True):
+            for chunk in stream_with_deadline(
+                    self.policy,
+                    lambda timeout: client.stream_generate(prompt, timeout=timeout),
+                    lambda timeout: client.stream_generate(prompt, self.policy.hedge_model, timeout),
+                    retryable=is_retryable):
+                chunks.append(chunk)
+                yield chunk
+        if chunks:
+            self.cache.put(question, "".join(chunks), self.resume_hash, self.PROMPT_VERSION)
+
+
+class TranscriptionSimulator(Transcriber):
+    name = "simulated"
+
+    def __init__(self):
+        self.transcription_templates = [
+            "Tell me about your experience with {technology}.",
+            "How do you handle difficult team members?",
+            "What's your approach to solving complex problems?",
+            "Describe a situation where you had to meet a tight deadline.",
+            "Where do you see yourself in five years?",
+            "How do you stay current with industry trends?",
+            "Tell me about a project you're particularly proud of.",
+            "How do you prioritize tasks when everything seems urgent?",
+            "What's your experience with agile development methodologies?",
+            "How would you explain a technical concept to a non-technical person?"
+        ]
+
+    def get_transcription(self, audio_file):
+        """Simulate transcription from audio file"""
+        # In a real implementation, this would use a speech-to-text service
+
+        # Get a random template based on the file creation time
+        file_stat = os.stat(audio_file)
+        template_index = int(file_stat.st_mtime) % len(self.transcription_templates)
+        template = self.transcription_templates[template_index]
+
+        # Replace {technology} with a random technology
+        technologies = ["Python", "JavaScript", "React", "machine learning", "data analysis",
+                        "cloud computing", "DevOps", "agile methodologies"]
+        technology_index = int(file_stat.st_size) % len(technologies)
+
+        transcription = template.replace("{technology}", technologies[technology_index])
+
+        print(f"Simulated transcription: {transcription}")
+        return transcription
+
+    def transcribe(self, audio_file):
+        return self.get_transcription(audio_file)
+
+
+def load_transcriber(engine=None):
+    """Like create_transcriber, but also accepts "simulated" """
+    if (engine or "").lower() == "simulated":
+        return TranscriptionSimulator()
+    return create_transcriber(engine)
+
+
+class InterviewEngine:
+    """Audio in, transcripts and answers out, with no UI attached
+
+    Progress is reported as plain dicts passed to `on_event`, which is called
+    from worker threads. Event types: transcript, answer_start, answer_chunk,
+    answer, error, suppressed, speculation and stats. Each carries the `seq` of
+    the question it belongs to, except a speculation that hasn't been claimed yet.
+
+    With a `detector` (a QuestionDetector) only the question found in a
+    transcript is sent to the model; in live mode a transcript without one is
+    skipped. Live transcripts then go through `gate` (a TranscriptGate), so
+    silence, filler and repeats of a recent question don't reach the model.
+    With `speculate`, a pause of `pause_ms` inside an utterance is transcribed
+    and, if it already reads as a question, answered right away; the final
+    transcript then either claims that answer or discards it.
+    With a `store` (a SessionStore) every answered question is saved with its
+    transcript and timings.
+    """
+
+    def __init__(self, transcriber, answerer=None, on_event=None, sample_rate=44100, channels=1,
+                 device=None, output_rate=SPEECH_RATE, transcribe_workers=2, answer_workers=2, gate=None,
+                 speculate=False, pause_ms=300, detector=None,
+                 store=None, source="engine"):
+        self.transcriber = transcriber
+        self.answerer = answerer
+        self.gate = gate
+        self.detector = detector
+        # Partial transcripts must read as a whole question before an answer is started
+        self._partial_detector = detector or QuestionDetector()
+        self.suppressed_counts = Counter()
+        self.store = store
+        self.source = source
+        self._unsaved = {}
+        self.speculate = speculate
+        self.pause_ms = pause_ms
+        self.speculation_counts = Counter()
+        self._speculation = None
+        self._speculation_lock = threading.Lock()
+        self._utterances = 0
+        self.on_event = on_event
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.device = device
+        self.output_rate = output_rate
+        self.transcribe_workers = transcribe_workers
+        self.answer_workers = answer_workers
+        self.counter = itertools.count()
+        self.session = None
+        self._stop = threading.Event()
+
+    def next_seq(self):
+        return next(self.counter)
+
+    def emit(self, event_type, **fields):
+        event = {"type": event_type, "time": round(time.time(), 3)}
+        event.update(fields)
+        if self.on_event:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                print(f"Error handling {event_type} event: {e}")
+        if self.store is not None and "seq" in event:
+            self._save_event(event)
+        return event
+
+    def _save_event(self, event):
+        """Collect a question's events and hand the finished exchange to the store"""
+        kind, seq = event["type"], event["seq"]
+        if kind == "transcript" and event["text"]:
+            self._unsaved[seq] = {"transcript": event["text"], "transcribe_ms": event.get("ms")}
+            if self.answerer is None:
+                self.store.record(source=self.source, **self._unsaved.pop(seq))
+        elif kind == "answer_start":
+            self._unsaved.setdefault(seq, {})["question"] = event["question"]
+        elif kind == "answer":
+            exchange = self._unsaved.pop(seq, {})
+            self.store.record(answer=event["text"], first_chunk_ms=event.get("first_chunk_ms"),
+                              answer_ms=event.get("ms"), source=self.source,
+                              resume_hash=getattr(self.answerer, "resume_hash", ""), **exchange)
+        elif kind in ("suppressed", "error"):
+            self._unsaved.pop(seq, None)
+
+    def transcribe_file(self, seq, audio_file):
+        started = time.perf_counter()
+        with span("transcribe", seq=seq, engine=self.transcriber.name):
+            text = self.transcriber.transcribe(audio_file)
+        self.emit("transcript", seq=seq, text=text, source=audio_file,
+                  ms=round((time.perf_counter() - started) * 1000, 1))
+        return text
+
+    def transcribe_segment(self, seq, samples, sample_rate=None):
+        started = time.perf_counter()
+        with span("transcribe", seq=seq, engine=self.transcriber.name):
+            text = self.transcriber.transcribe_array(samples, sample_rate or self.output_rate)
+        self.emit("transcript", seq=seq, text=text, seconds=round(len(samples) / (sample_rate or self.output_rate), 2),
+                  ms=round((time.perf_counter() - started) * 1000, 1))
+        return text
+
+    def answer(self, seq, text, speculation=None):
+        """Stream an answer for `text`, reporting each chunk; returns the full answer
+
+        With a claimed SpeculativeAnswer its chunks are used instead of a new request.
+        """
+        if self.answerer is None or not text:
+            return None
+        started = time.perf_counter()
+        first_chunk_ms = None
+        chunks = []
+        self.emit("answer_start", seq=seq, question=text)
+        try:
+            with span("answer", seq=seq, speculative=speculation is not None):
+                stream = speculation.stream() if speculation else self.answerer.stream_interview_response(text)
+                for chunk in stream:
+                    if first_chunk_ms is None:
+                        tracer.record("first_chunk", started, seq=seq)
+                        first_chunk_ms = round((time.perf_counter() - started) * 1000, 1)
+                    chunks.append(chunk)
+                    self.emit("answer_chunk", seq=seq, text=chunk)
+        except Exception as e:
+            print(f"Error streaming response: {e}")
+            self.emit("error", seq=seq, stage="answer", message=str(e))
+            return None
+        answer = "".join(chunks)
+        # Answerers that keep a conversation context learn what was actually shown
+        remember = getattr(self.answerer, "remember", None)
+        if remember and answer:
+            remember(text, answer)
+        self.emit("answer", seq=seq, text=answer, first_chunk_ms=first_chunk_ms,
+                  ms=round((time.perf_counter() - started) * 1000, 1), speculative=speculation is not None)
+        return answer
+
+    def process_file(self, audio_file, seq=None):
+        """Transcribe one recording and answer it"""
+        if seq is None:
+            seq = self.next_seq()
+        try:
+            text = self.transcribe_file(seq, audio_file)
+        except Exception as e:
+            print(f"Error transcribing {audio_file}: {e}")
+            self.emit("error", seq=seq, stage="transcribe", source=audio_file, message=str(e))
+            return None
+        # A recording was made on purpose, so without a clear question the whole transcript is sent
+        question = (self.detector.extract(text) if self.detector is not None else None) or text
+        return {"seq": seq, "transcript": text, "question": question, "answer": self.answer(seq, question)}
+
+    def run_live(self, duration=None):
+        """Listen until stop() is called (or for `duration` seconds), answering each utterance"""
+        # One stream stays open for the whole run, so no audio is lost between questions
+        segmenter = None
+        if self.speculate and self.answerer is not None:
+            segmenter = SpeechSegmenter(self.output_rate, pause_ms=self.pause_ms, on_pause=self._on_pause)
+        session = CaptureSession(self.sample_rate, channels=self.channels, device=self.device,
+                                 output_rate=self.output_rate, segmenter=segmenter)
+
+        # Capture -> transcribe -> answer; when a stage falls behind the oldest
+        # waiting item is dropped so capture never waits on the network
+        segments = BoundedQueue(4, policy=BoundedQueue.DROP_OLDEST)
+        transcripts = BoundedQueue(2, policy=BoundedQueue.DROP_OLDEST)
+        pipeline = Pipeline()
+        pipeline.add_stage('transcribe', self._transcribe_stage, segments, transcripts,
+                           workers=self.transcribe_workers)
+        pipeline.add_stage('answer', self._answer_stage, transcripts, workers=self.answer_workers)
+        # Only the latest pause of an utterance is worth transcribing
+        self._pauses = BoundedQueue(1, policy=BoundedQueue.DROP_OLDEST)
+        if segmenter is not None:
+            pipeline.add_stage('speculate', self._speculate_stage, self._pauses)
+
+        self._stop.clear()
+        self._utterances = 0
+        self.speculation_counts.clear()
+        self.suppressed_counts.clear()
+        try:
+            session.start()
+        except Exception as e:
+            print(f"Error starting live capture: {e}")
+            self.emit("error", stage="capture", message=str(e))
+            return None
+        self.session = session
+
+        pipeline.start()
+        deadline = time.monotonic() + duration if duration else None
+        try:
+            while not self._stop.is_set():
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                segment = session.get_segment(timeout=0.5)
+                if segment is not None:
+                    # Segments arrive in order, so this matches the segmenter's utterance index
+                    utterance = self._utterances
+                    self._utterances += 1
+                    segments.put((self.next_seq(), segment, utterance))
+        finally:
+            session.stop()
+            pipeline.stop()
+            self._discard_speculation(None, "stopped")
+            stats = pipeline.stats()
+            print(f"Live pipeline stats: {stats}")
+            extra = {"suppressed": dict(self.suppressed_counts)}
+            if self.gate is not None:
+                extra["gate"] = self.gate.stats()
+                print(f"Transcript gate: {extra['gate']}")
+            if segmenter is not None:
+                extra["speculation"] = dict(self.speculation_counts)
+                print(f"Speculative answers: {extra['speculation']}")
+            self.emit("stats", pipeline=stats, **extra)
+        return stats
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def is_listening(self):
+        session = self.session
+        return session is not None and session.is_running
+
+    def _transcribe_stage(self, item):
+        seq, segment, utterance = item
+        text = self.transcribe_segment(seq, segment)
+        question = text
+        if self.detector is not None and text:
+            question = self.detector.extract(text)
+            if question is None:
+                return self._suppress(seq, utterance, text, "no_question")
+        if self.gate is not None:
+            allowed, reason = self.gate.check(question)
+            if not allowed:
+                return self._suppress(seq, utterance, text, reason)
+        if not question:
+            return self._suppress(seq, utterance, text, "empty")
+        return seq, question, utterance
+
+    def _suppress(self, seq, utterance, text, reason):
+        self._discard_speculation(utterance, "suppressed", seq)
+        self.suppressed_counts[reason] += 1
+        self.emit("suppressed", seq=seq, text=text, reason=reason, total=sum(self.suppressed_counts.values()))
+        return None
+
+    def _answer_stage(self, item):
+        seq, text, utterance = item
+        self.answer(seq, text, self._claim_speculation(seq, text, utterance))
+
+    def _on_pause(self, samples, utterance):
+        # Called on the capture thread; transcription happens in the speculate stage
+        self._pauses.put((utterance, samples))
+
+    def _speculate_stage(self, item):
+        utterance, samples = item
+        if utterance < self._utterances:
+            return  # the utterance has already ended
+        with span("speculative_transcribe", utterance=utterance):
+            text = self.transcriber.transcribe_array(samples, self.output_rate)
+        text = self._partial_detector.extract(text)
+        if text is None or (self.gate is not None and not self.gate.check(text, record=False)[0]):
+            return
+
+        with self._speculation_lock:
+            current = self._speculation
+            if utterance < self._utterances:
+                return
+            if current is not None and current.utterance == utterance and same_question(current.question, text):
+                return
+            self._speculation = SpeculativeAnswer(self.answerer, text, utterance)
+            self.speculation_counts["started"] += 1
+        if current is not None:
+            current.cancel()
+            self.speculation_counts["discarded"] += 1
+            self.emit("speculation", status="discarded", reason="changed", question=current.question)
+        print(f"Answering early: {text}")
+        self.emit("speculation", status="started", question=text)
+
+    def _claim_speculation(self, seq, text, utterance):
+        """Return the speculative answer for this utterance if it asked the same question"""
+        with self._speculation_lock:
+            speculation = self._speculation
+            if speculation is None or speculation.utterance > utterance:
+                return None
+            self._speculation = None
+        if speculation.utterance < utterance:
+            # Its own final transcript was dropped or suppressed along the way
+            speculation.cancel()
+            self.speculation_counts["discarded"] += 1
+            self.emit("speculation", status="discarded", reason="stale", question=speculation.question)
+            return None
+        if same_question(speculation.question, text):
+            self.speculation_counts["used"] += 1
+            self.emit("speculation", seq=seq, status="used", question=speculation.question,
+                      lead_ms=round((time.perf_counter() - speculation.started) * 1000, 1))
+            return speculation
+        speculation.cancel()
+        self.speculation_counts["discarded"] += 1
+        self.emit("speculation", seq=seq, status="discarded", reason="changed", question=speculation.question)
+        return None
+
+    def _discard_speculation(self, utterance, reason, seq=None):
+        """Cancel the speculative answer (for `utterance`, or any if None)"""
+        with self._speculation_lock:
+            speculation = self._speculation
+            if speculation is None or (utterance is not None and speculation.utterance != utterance):
+                return
+            self._speculation = None
+        speculation.cancel()
+        self.speculation_counts["discarded"] += 1
+        self.emit("speculation", seq=seq, status="discarded", reason=reason, question=speculation.question)
+
+
+def make_answerer(kind=None, resume_file=None, pool_size=4):
+    """Build the answerer for the CLI: REST with a key, otherwise simulated responses"""
+    api_key = os.getenv('GEMINI_API_KEY')
+    kind = kind or ("rest" if has_api_key(api_key) else "simulated")
+    if kind == "sdk":
+        return GeminiAPI(context=ConversationContext())
+    if kind == "simulated":
+        return GeminiAPI(simulated=True)
+    if not has_api_key(api_key):
+        raise GeminiError("GEMINI_API_KEY is not set")
+    answerer = ResumeAnswerer(api_key, pool_size=pool_size)
+    if resume_file:
+        with open(resume_file, 'r', encoding='utf-8') as f:
+            answerer.load_resume(f.read())
+    return answerer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Transcribe interview audio and generate answers without the UI. "
+                    "Results are written as JSON lines; logs go to stderr.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", nargs="+", help="audio file(s) to process in order")
+    source.add_argument("--live", action="store_true", help="listen to an input device")
+    parser.add_argument("--device", help="input device name or index for --live")
+    parser.add_argument("--duration", type=float, help="stop --live after this many seconds")
+    parser.add_argument("--transcriber", help="google, vosk or simulated (default: TRANSCRIBER or google)")
+    parser.add_argument("--answerer", choices=["rest", "sdk", "simulated"],
+                        help="rest (default with GEMINI_API_KEY), sdk or simulated")
+    parser.add_argument("--resume", help="plain-text resume used to tailor answers (rest answerer)")
+    parser.add_argument("--no-answer", action="store_true", help="only transcribe")
+    parser.add_argument("--no-gate", action="store_true",
+                        help="send whole transcripts and, with --live, answer every one, "
+                             "including small talk, filler and repeats")
+    parser.add_argument("--speculate", action="store_true",
+                        help="with --live, start answering at a pause if the question already seems complete")
+    parser.add_argument("--chunks", action="store_true", help="also emit answer chunks as they stream")
+    parser.add_argument("--output", help="append JSON lines to this file instead of stdout")
+    parser.add_argument("--no-store", action="store_true",
+                        help="don't save questions and answers to the session history (temp/sessions.sqlite3)")
+    parser.add_argument("--trace", help="write a Chrome trace-event file of the stage timings on exit")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    export_on_exit(args.trace)
+
+    # The modules log with print(); keep stdout for the JSON lines only
+    stdout = sys.stdout
+    output = open(args.output, 'a', encoding='utf-8') if args.output else stdout
+    sys.stdout = sys.stderr
+    output_lock = threading.Lock()
+
+    def write_event(event):
+        if event["type"] == "answer_chunk" and not args.chunks:
+            return
+        with output_lock:
+            output.write(json.dumps(event) + "\n")
+            output.flush()
+
+    try:
+        transcriber = load_transcriber(args.transcriber)
+        answerer = None if args.no_answer else make_answerer(args.answerer, args.resume)
+        device = int(args.device) if args.device and args.device.isdigit() else args.device
+        gate = None if args.no_gate else TranscriptGate()
+        detector = None if args.no_gate else QuestionDetector()
+        store = None if args.no_store else SessionStore(SESSIONS_FILE)
+        engine = InterviewEngine(transcriber, answerer, on_event=write_event, device=device, gate=gate,
+                                 speculate=args.speculate, detector=detector, store=store, source="cli")
+
+        if args.live:
+            try:
+                engine.run_live(args.duration)
+            except KeyboardInterrupt:
+                engine.stop()
+        else:
+            for audio_file in args.file:
+                engine.process_file(audio_file)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        sys.stdout = stdout
+        if output is not stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
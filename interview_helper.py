@@ -1,3 +1,4 @@
+from startup import lazy_import, mark, startup_report, warm_imports
 import os
 import sys
 import time
@@ -5,42 +6,67 @@ import threading
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 import numpy as np
-import sounddevice as sd
-import soundfile as sf
-from scipy.io.wavfile import write
-import google.generativeai as genai
 from dotenv import load_dotenv
 from datetime import datetime
 import tempfile
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from PIL import Image, ImageTk
+from audio_buffer import RingBuffer
+from audio_writer import StreamingWriter, join_segments
+from audio_format import SPEECH_RATE, CaptureFormat, to_float32
+from transcriber import create_transcriber
+from interview_engine import TEMP_DIR, GeminiAPI, InterviewEngine, TranscriptionSimulator
+from transcript_gate import TranscriptGate
+from question_detector import QuestionDetector
+from conversation import ConversationContext
+from session_store import DEFAULT_PATH as SESSIONS_FILE, SessionStore
+from session_search import SessionSearch
+from tracing import export_on_exit, span, traced
+from trace_panel import TracePanel
+
+# Slow to import and not needed to draw the first window; loaded on first use
+# or warmed in the background once the window is up
+sd = lazy_import('sounddevice')
+sf = lazy_import('soundfile')
+plt = lazy_import('matplotlib.pyplot')
+backend_tkagg = lazy_import('matplotlib.backends.backend_tkagg')
 
 # Load environment variables
 load_dotenv()
 
-# Create temp directory if it doesn't exist
-TEMP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp')
-os.makedirs(TEMP_DIR, exist_ok=True)
-
 class AudioRecorder:
-    def __init__(self):
+    def __init__(self, buffer_seconds=30, spill=False, file_format='flac', segment_seconds=None,
+                 speech_format=True):
         self.is_recording = False
         self.audio_thread = None
-        self.frames = []
         self.sample_rate = 44100
         self.channels = 1
-        self.recording_file = os.path.join(TEMP_DIR, 'recording.wav')
-        self.visualization_data = []
-        self.visualization_callback = None
+        
+        # With speech_format, blocks are converted to 16 kHz mono int16 in the callback,
+        # which is all transcription needs and roughly 5x less data to hold and write
+        self.capture_format = CaptureFormat(self.sample_rate) if speech_format else None
+        self.output_rate = SPEECH_RATE if speech_format else self.sample_rate
+        
+        # Audio is streamed to disk while recording so memory stays flat
+        self.writer = StreamingWriter(os.path.join(TEMP_DIR, 'recording'), self.output_rate,
+                                      channels=self.channels, format=file_format,
+                                      segment_seconds=segment_seconds)
+        self.recording_file = self.writer.path
+        self.recording_files = []
+        self.visualization_points = 1000
+        
+        # Preallocated buffer holding the most recent audio for live views
+        self.buffer = RingBuffer(int(self.output_rate * buffer_seconds), channels=self.channels,
+                                 dtype=np.int16 if speech_format else np.float32,
+                                 sample_rate=self.output_rate, spill=spill)
     
     def start_recording(self):
         if self.is_recording:
             return False
         
         self.is_recording = True
-        self.frames = []
-        self.visualization_data = []
+        self.buffer.clear()
+        if self.capture_format:
+            self.capture_format.reset()
+        self.writer.start()
         self.audio_thread = threading.Thread(target=self._record_audio)
         self.audio_thread.daemon = True
         self.audio_thread.start()
@@ -51,19 +77,10 @@ class AudioRecorder:
             def callback(indata, frames, time, status):
                 if status:
                     print(f"Status: {status}")
-                self.frames.append(indata.copy())
-                
-                # Process data for visualization
-                audio_data = indata.flatten()
-                # Downsample for visualization
-                if len(audio_data) > 100:
-                    audio_data = audio_data[::len(audio_data)//100]
-                self.visualization_data.append(audio_data)
-                
-                # Call visualization callback if set
-                if self.visualization_callback and len(self.visualization_data) % 5 == 0:
-                    vis_data = np.concatenate(self.visualization_data[-10:])
-                    self.visualization_callback(vis_data)
+                block = self.capture_format.process(indata) if self.capture_format else indata.copy()
+                # Keep this cheap: the waveform is drawn by polling the buffer from the UI thread
+                self.buffer.write(block)
+                self.writer.write(block)
             
             with sd.InputStream(samplerate=self.sample_rate, channels=self.channels, callback=callback):
                 print("Recording started...")
@@ -74,6 +91,17 @@ class AudioRecorder:
             print(f"Error in recording: {e}")
             self.is_recording = False
     
+    def get_latest(self, seconds):
+        """View of the last `seconds` of captured audio (not a copy)"""
+        return self.buffer.last_seconds(seconds)[:, 0]
+    
+    def get_visualization_data(self, seconds=0.25):
+        audio_data = self.get_latest(seconds)
+        # Downsample for visualization with a strided view
+        step = max(1, len(audio_data) // self.visualization_points)
+        return to_float32(audio_data[::step])
+    
+    @traced("stop_recording")
     def stop_recording(self):
         if not self.is_recording:
             return None
@@ -83,20 +111,18 @@ class AudioRecorder:
             self.audio_thread.join(timeout=2.0)
         
         try:
-            if self.frames:
-                # Convert list of numpy arrays to a single array
-                audio_data = np.concatenate(self.frames, axis=0)
-                
-                # Save as WAV file
-                write(self.recording_file, self.sample_rate, audio_data)
-                print(f"Recording saved to {self.recording_file}")
-                
-                # If actual recording failed, create a test tone
-                if len(audio_data) < 100:
-                    self._create_test_tone()
-                
+            files = self.writer.close()
+            if self.writer.error:
+                raise self.writer.error
+            
+            if files and self.writer.frames_written >= 100:
+                print(f"Recording saved to {', '.join(files)}")
+                self.recording_files = files
+                # Segments are for crash safety; the question spans all of them
+                self.recording_file = files[0] if len(files) == 1 else join_segments(files, self.writer.path)
                 return self.recording_file
             else:
+                # If actual recording failed, create a test tone
                 print("No audio data captured")
                 self._create_test_tone()
                 return self.recording_file
@@ -109,121 +135,73 @@ class AudioRecorder:
         """Create a test tone if recording fails"""
         print("Creating test tone...")
         duration = 3  # seconds
-        t = np.linspace(0, duration, int(self.sample_rate * duration), False)
+        t = np.linspace(0, duration, int(self.output_rate * duration), False)
         tone = 0.5 * np.sin(2 * np.pi * 440 * t)  # 440 Hz tone at half amplitude
-        write(self.recording_file, self.sample_rate, tone)
+        self.recording_file = self.writer.path
+        self.recording_files = [self.recording_file]
+        sf.write(self.recording_file, tone, self.output_rate)
         print(f"Test tone created at {self.recording_file}")
-    
-    def set_visualization_callback(self, callback):
-        self.visualization_callback = callback
 
 
-class GeminiAPI:
-    def __init__(self):
-        self.api_key = os.getenv('GEMINI_API_KEY')
-        self.is_simulated = False
-        
-        if not self.api_key or self.api_key == 'your_gemini_api_key_here':
-            print("No Gemini API key found. Using simulated responses.")
-            self.is_simulated = True
-        else:
-            try:
-                genai.configure(api_key=self.api_key)
-                self.model = genai.GenerativeModel('gemini-pro')
-                print("Gemini API initialized successfully")
-            except Exception as e:
-                print(f"Error initializing Gemini API: {e}")
-                self.is_simulated = True
+class WaveformRenderer:
+    """Redraws one persistent line artist from the Tk thread at a fixed frame rate
+
+    Only the line is redrawn (blitted over a cached background), and the audio
+    thread never touches matplotlib.
+    """
+    POINTS = 500
     
-    def get_interview_response(self, text):
-        if not text:
-            return "Please provide interview text to analyze."
-        
-        if self.is_simulated:
-            return self._get_simulated_response(text)
-        
+    def __init__(self, root, canvas, ax, line, source, fps=20):
+        self.root = root
+        self.canvas = canvas
+        self.ax = ax
+        self.line = line
+        self.source = source
+        self.interval = int(1000 / fps)
+        self.background = None
+        self._job = None
+        self._indexes = {}
+        
+        # The background has to be captured again whenever the figure is fully redrawn
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+    
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
+    
+    def start(self):
+        if self._job is None:
+            self._job = self.root.after(self.interval, self._tick)
+    
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+    
+    def _tick(self):
         try:
-            prompt = f"""
-You are an expert interview coach. Based on the following interview question or conversation, 
-provide a concise, professional response that would impress the interviewer.
-
-If the text contains multiple speakers or a back-and-forth conversation, identify the most recent question 
-or topic that needs addressing.
-
-Interview text:
-\"\"\"
-{text}
-\"\"\"
-
-Provide a response that demonstrates:
-1. Clear understanding of the question/topic
-2. Relevant experience and knowledge
-3. Structured thinking
-4. Positive attitude
-
-Keep your response concise (3-5 sentences) but impactful. Focus on key points that would make the candidate stand out.
-"""
-            
-            print("Sending request to Gemini API...")
-            response = self.model.generate_content(prompt)
-            print("Response received from Gemini API")
-            return response.text
+            audio_data = self.source()
+            if audio_data is not None and len(audio_data):
+                self.draw(audio_data)
         except Exception as e:
-            print(f"Error with Gemini API: {e}")
-            return self._get_simulated_response(text)
-    
-    def _get_simulated_response(self, text):
-        print("Using simulated response")
-        responses = [
-            "I've successfully handled similar challenges by implementing a structured approach that focuses on prioritization, clear communication, and regular progress tracking. My experience has taught me the importance of both technical excellence and collaborative teamwork to ensure optimal results.",
-            
-            "My approach to problem-solving combines analytical thinking with creative solutions. I first break down complex issues into manageable components, then systematically address each while maintaining a holistic view. This methodology has consistently delivered successful outcomes in my previous roles.",
-            
-            "I believe effective leadership comes from a combination of clear vision, empathetic communication, and leading by example. Throughout my career, I've found that empowering team members while providing appropriate guidance creates an environment where innovation and productivity flourish naturally.",
-            
-            "Based on my experience with similar projects, I would approach this by first establishing clear requirements and success metrics, then developing a phased implementation plan with built-in feedback loops. This ensures we can deliver value quickly while remaining adaptable to changing needs.",
-            
-            "Technical challenges often require both depth of expertise and breadth of perspective. I've cultivated both through continuous learning and collaborative work across disciplines. This balanced approach has proven effective when tackling complex problems that require innovative solutions."
-        ]
-        
-        # Simple selection based on text length
-        index = len(text) % len(responses)
-        return responses[index]
-
-
-class TranscriptionSimulator:
-    def __init__(self):
-        self.transcription_templates = [
-            "Tell me about your experience with {technology}.",
-            "How do you handle difficult team members?",
-            "What's your approach to solving complex problems?",
-            "Describe a situation where you had to meet a tight deadline.",
-            "Where do you see yourself in five years?",
-            "How do you stay current with industry trends?",
-            "Tell me about a project you're particularly proud of.",
-            "How do you prioritize tasks when everything seems urgent?",
-            "What's your experience with agile development methodologies?",
-            "How would you explain a technical concept to a non-technical person?"
-        ]
+            print(f"Error updating visualization: {e}")
+        self._job = self.root.after(self.interval, self._tick)
     
-    def get_transcription(self, audio_file):
-        """Simulate transcription from audio file"""
-        # In a real implementation, this would use a speech-to-text service
-        
-        # Get a random template based on the file creation time
-        file_stat = os.stat(audio_file)
-        template_index = int(file_stat.st_mtime) % len(self.transcription_templates)
-        template = self.transcription_templates[template_index]
-        
-        # Replace {technology} with a random technology
-        technologies = ["Python", "JavaScript", "React", "machine learning", "data analysis", 
-                        "cloud computing", "DevOps", "agile methodologies"]
-        technology_index = int(file_stat.st_size) % len(technologies)
-        
-        transcription = template.replace("{technology}", technologies[technology_index])
-        
-        print(f"Simulated transcription: {transcription}")
-        return transcription
+    def draw(self, audio_data):
+        # Pick a fixed number of points so the line's x data never changes
+        count = len(audio_data)
+        indexes = self._indexes.get(count)
+        if indexes is None:
+            indexes = np.linspace(0, count - 1, self.POINTS).astype(int)
+            self._indexes[count] = indexes
+        self.line.set_ydata(audio_data[indexes])
+        
+        if self.background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
 
 
 class InterviewHelperApp:
@@ -234,16 +212,73 @@ class InterviewHelperApp:
         self.root.configure(bg="#f5f5f5")
         
         self.recorder = AudioRecorder()
-        self.gemini_api = GeminiAPI()
+        # Follow-up questions are answered with the recent conversation in the prompt
+        self.gemini_api = GeminiAPI(context=ConversationContext())
+        # The engine named by TRANSCRIBER in .env (Google if that one can't be loaded),
+        # otherwise the simulator
         self.transcriber = TranscriptionSimulator()
+        if os.getenv('TRANSCRIBER'):
+            self.transcriber = create_transcriber(fallback="google")
+            self.transcriber.warm_up_async()
         self.is_recording = False
         self.continuous_mode = False
         self.continuous_thread = None
+        self.last_answer_seq = -1
+        # Every answered question is saved in the background and can be searched with F3
+        self.store = SessionStore(SESSIONS_FILE)
+        
+        # Transcription and answering run in the UI-free engine; its events are
+        # applied to the widgets on the Tk thread
+        self.engine = InterviewEngine(self.transcriber, self.gemini_api, on_event=self.on_engine_event,
+                                      sample_rate=self.recorder.sample_rate, channels=self.recorder.channels,
+                                      output_rate=self.recorder.output_rate, gate=TranscriptGate(),
+                                      detector=QuestionDetector(), speculate=os.getenv('SPECULATIVE_ANSWERS') == '1',
+                                      store=self.store, source="helper")
         
         self._setup_ui()
         
-        # Initialize the recorder visualization callback
-        self.recorder.set_visualization_callback(self.update_visualization)
+        self.waveform = None
+        
+        # Stage timings, toggled with F12 (or shown at startup with TRACE_PANEL=1)
+        self.trace_panel = TracePanel(self.root, os.path.join(TEMP_DIR, 'trace.json'))
+        self.root.bind('<F12>', self.trace_panel.toggle)
+        if os.getenv('TRACE_PANEL'):
+            self.root.after_idle(self.trace_panel.show)
+        self.session_search = SessionSearch(self.root, self.store)
+        self.root.bind('<F3>', self.session_search.toggle)
+        
+        # Everything slow happens once the window is on screen
+        self.root.after_idle(self._finish_startup)
+    
+    def _finish_startup(self):
+        mark("window drawn")
+        startup_report("interview_helper", log_file=os.path.join(TEMP_DIR, 'startup_times.jsonl'))
+        
+        def warm():
+            warm_imports(sd, sf).join()
+            self.gemini_api.load_model()
+            warm_imports(plt, backend_tkagg).join()
+            self.root.after(0, self._setup_visualization)
+        
+        thread = threading.Thread(target=warm)
+        thread.daemon = True
+        thread.start()
+    
+    def _setup_visualization(self):
+        self.fig, self.ax = plt.subplots(figsize=(8, 1.5))
+        self.canvas = backend_tkagg.FigureCanvasTkAgg(self.fig, master=self.visualization_frame)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.ax.set_title("Audio Visualization")
+        self.ax.set_ylim(-1, 1)
+        self.ax.set_xlim(0, WaveformRenderer.POINTS - 1)
+        self.waveform_line, = self.ax.plot(np.zeros(WaveformRenderer.POINTS), animated=True)
+        self.fig.tight_layout()
+        
+        # Draw the waveform from the UI thread at a fixed frame rate
+        self.waveform = WaveformRenderer(self.root, self.canvas, self.ax, self.waveform_line,
+                                         self.get_visualization_data)
+        self.waveform.start()
+        mark("visualization ready")
     
     def _setup_ui(self):
         # Main container
@@ -311,15 +346,10 @@ class InterviewHelperApp:
         self.error_label = ttk.Label(main_frame, textvariable=self.error_var, foreground="red")
         self.error_label.pack(pady=(0, 10))
         
-        # Audio visualization
-        self.fig, self.ax = plt.subplots(figsize=(8, 1.5))
-        self.canvas = FigureCanvasTkAgg(self.fig, master=main_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.X, pady=(0, 10))
-        self.ax.set_title("Audio Visualization")
-        self.ax.set_ylim(-1, 1)
-        self.ax.set_xlim(0, 100)
-        self.ax.plot(np.zeros(100))
-        self.fig.tight_layout()
+        # Audio visualization; the plot is added once matplotlib has loaded
+        self.visualization_frame = ttk.Frame(main_frame, height=150)
+        self.visualization_frame.pack(fill=tk.X, pady=(0, 10))
+        self.visualization_frame.pack_propagate(False)
         
         # Transcription area
         transcription_frame = ttk.LabelFrame(main_frame, text="Interview Transcription", padding=10)
@@ -357,17 +387,12 @@ class InterviewHelperApp:
         style.configure("Start.TButton", background="#4CAF50", foreground="white")
         style.configure("Stop.TButton", background="#f44336", foreground="white")
     
-    def update_visualization(self, audio_data):
-        try:
-            self.ax.clear()
-            self.ax.set_ylim(-1, 1)
-            self.ax.set_xlim(0, len(audio_data))
-            self.ax.plot(audio_data)
-            self.ax.set_title("Audio Visualization")
-            self.fig.tight_layout()
-            self.canvas.draw()
-        except Exception as e:
-            print(f"Error updating visualization: {e}")
+    def get_visualization_data(self):
+        if self.engine.is_listening:
+            return to_float32(self.engine.session.buffer.last_seconds(0.25))
+        if self.recorder.is_recording:
+            return self.recorder.get_visualization_data()
+        return None
     
     def start_recording(self):
         if self.is_recording:
@@ -403,20 +428,10 @@ class InterviewHelperApp:
             self.stop_button.config(state=tk.DISABLED)
             
             if audio_file:
-                # Transcribe the audio
-                transcription = self.transcriber.get_transcription(audio_file)
-                
-                # Update the transcription text
-                self.update_text_widget(self.transcription_text, transcription)
-                
-                # Get AI response
-                self.status_var.set("Getting AI response...")
-                response = self.gemini_api.get_interview_response(transcription)
-                
-                # Update the response text
-                self.update_text_widget(self.response_text, response)
-                
-                self.status_var.set("Processed successfully.")
+                # Transcribe and stream the AI response off the UI thread
+                thread = threading.Thread(target=self.engine.process_file, args=(audio_file,))
+                thread.daemon = True
+                thread.start()
             else:
                 self.error_var.set("Error: No audio recorded")
                 self.status_var.set("Ready to assist with your interview.")
@@ -431,6 +446,60 @@ class InterviewHelperApp:
         widget.insert(tk.END, text)
         widget.config(state=tk.DISABLED)
     
+    def append_text_widget(self, widget, text):
+        widget.config(state=tk.NORMAL)
+        widget.insert(tk.END, text)
+        widget.see(tk.END)
+        widget.config(state=tk.DISABLED)
+    
+    def on_engine_event(self, event):
+        # Called from engine worker threads
+        self.root.after(0, lambda: self.handle_engine_event(event))
+    
+    def handle_engine_event(self, event):
+        with span("ui_update", event=event["type"]):
+            self._apply_engine_event(event)
+    
+    def _apply_engine_event(self, event):
+        kind = event["type"]
+        if kind == "transcript":
+            self.update_text_widget(self.transcription_text, event["text"])
+            if not self.continuous_mode:
+                self.status_var.set("Getting AI response...")
+        elif kind == "answer_start":
+            self.begin_answer(event["seq"])
+        elif kind == "answer_chunk":
+            self.append_answer(event["seq"], event["text"])
+        elif kind == "answer":
+            self.finish_answer(event["seq"])
+        elif kind == "suppressed":
+            if event["reason"] in ("duplicate", "near_duplicate"):
+                skipped = "Repeated question"
+            elif event["reason"] == "no_question":
+                skipped = "No question heard"
+            else:
+                skipped = "Nothing to answer"
+            self.status_var.set(f"{skipped}; not sent to Gemini ({event['total']} skipped so far)")
+        elif kind == "error":
+            self.error_var.set(f"Error: {event['message']}")
+            if not self.continuous_mode:
+                self.status_var.set("Ready to assist with your interview.")
+    
+    def begin_answer(self, seq):
+        # Answers can finish out of order; never replace a newer one
+        if seq < self.last_answer_seq:
+            return
+        self.last_answer_seq = seq
+        self.update_text_widget(self.response_text, "")
+    
+    def append_answer(self, seq, chunk):
+        if seq == self.last_answer_seq:
+            self.append_text_widget(self.response_text, chunk)
+    
+    def finish_answer(self, seq):
+        if seq == self.last_answer_seq and not self.continuous_mode:
+            self.status_var.set("Processed successfully.")
+    
     def toggle_continuous_mode(self):
         is_enabled = self.toggle_var.get()
         
@@ -441,54 +510,19 @@ class InterviewHelperApp:
                 self.stop_button.config(state=tk.DISABLED)
                 self.status_var.set("Continuous mode enabled")
                 
-                # Start continuous processing in a separate thread
-                self.continuous_thread = threading.Thread(target=self.continuous_process)
+                # Listen and answer in a separate thread until the mode is switched off
+                self.continuous_thread = threading.Thread(target=self.engine.run_live)
                 self.continuous_thread.daemon = True
                 self.continuous_thread.start()
             else:
                 self.continuous_mode = False
+                self.engine.stop()
                 self.start_button.config(state=tk.NORMAL)
                 self.stop_button.config(state=tk.DISABLED)
                 self.status_var.set("Continuous mode disabled")
         except Exception as e:
             self.error_var.set(f"Error: {str(e)}")
             print(f"Error toggling continuous mode: {e}")
-    
-    def continuous_process(self):
-        while self.continuous_mode:
-            try:
-                # Start recording
-                self.recorder.start_recording()
-                self.is_recording = True
-                
-                # Record for 10 seconds
-                for i in range(10):
-                    if not self.continuous_mode:
-                        break
-                    time.sleep(1)
-                
-                if not self.continuous_mode:
-                    break
-                
-                # Stop recording
-                audio_file = self.recorder.stop_recording()
-                self.is_recording = False
-                
-                if audio_file:
-                    # Transcribe the audio
-                    transcription = self.transcriber.get_transcription(audio_file)
-                    
-                    # Update the transcription text
-                    self.root.after(0, lambda: self.update_text_widget(self.transcription_text, transcription))
-                    
-                    # Get AI response
-                    response = self.gemini_api.get_interview_response(transcription)
-                    
-                    # Update the response text
-                    self.root.after(0, lambda: self.update_text_widget(self.response_text, response))
-            except Exception as e:
-                print(f"Error in continuous processing: {e}")
-                time.sleep(2)  # Wait before retrying
 
 
 if __name__ == "__main__":
@@ -498,6 +532,9 @@ if __name__ == "__main__":
         with open(env_file, 'w') as f:
             f.write("GEMINI_API_KEY=your_gemini_api_key_here")
     
+    # Write stage timings on exit when TRACE_FILE is set
+    export_on_exit()
+    
     # Create the main window
     root = tk.Tk()
     app = InterviewHelperApp(root)
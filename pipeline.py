@@ -0,0 +1,154 @@
+import queue
+import threading
+import time
+from collections import deque
+
+
+class BoundedQueue:
+    """Fixed-size hand-off between stages with an explicit policy for when it is full
+
+    - block: the producer waits (backpressure)
+    - drop_oldest: the oldest waiting item is discarded to make room
+    - drop_newest: the new item is discarded
+    """
+
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop_oldest'
+    DROP_NEWEST = 'drop_newest'
+
+    def __init__(self, maxsize, policy=BLOCK):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        if policy not in (self.BLOCK, self.DROP_OLDEST, self.DROP_NEWEST):
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+    def put(self, item, timeout=None):
+        """Add an item; returns False if it was dropped or the wait timed out"""
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                if self.policy == self.DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                if self.policy == self.DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                elif not self._cond.wait_for(lambda: len(self._items) < self.maxsize, timeout):
+                    return False
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """Remove and return the oldest item, raising queue.Empty on timeout"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def clear(self):
+        with self._cond:
+            self._items.clear()
+            self._cond.notify_all()
+
+
+class Stage:
+    """A pool of worker threads applying `func` to items from `inbox`
+
+    Results that are not None are put on `outbox`.
+    """
+
+    def __init__(self, name, func, inbox, outbox=None, workers=1):
+        self.name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.workers = workers
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self, stop_event):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, args=(stop_event,), name=f"{self.name}-{i}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def _work(self, stop_event):
+        while not stop_event.is_set():
+            try:
+                item = self.inbox.get(timeout=0.2)
+            except queue.Empty:
+                continue
+
+            started = time.perf_counter()
+            try:
+                result = self.func(item)
+            except Exception as e:
+                print(f"Error in {self.name} stage: {e}")
+                with self._lock:
+                    self.errors += 1
+                continue
+            with self._lock:
+                self.processed += 1
+                self.busy_time += time.perf_counter() - started
+
+            if result is not None and self.outbox is not None:
+                # Re-check so a blocking outbox can't hold a worker past shutdown
+                while not self.outbox.put(result, timeout=0.2):
+                    if stop_event.is_set() or self.outbox.policy != BoundedQueue.BLOCK:
+                        break
+
+    def stats(self):
+        with self._lock:
+            return {
+                'processed': self.processed,
+                'errors': self.errors,
+                'busy_seconds': round(self.busy_time, 3),
+                'queued': len(self.inbox),
+                'dropped': self.inbox.dropped,
+            }
+
+
+class Pipeline:
+    """Stages joined by bounded queues, each running on its own workers"""
+
+    def __init__(self):
+        self.stages = []
+        self._stop = threading.Event()
+
+    def add_stage(self, name, func, inbox, outbox=None, workers=1):
+        stage = Stage(name, func, inbox, outbox, workers)
+        self.stages.append(stage)
+        return stage
+
+    def start(self):
+        self._stop.clear()
+        for stage in self.stages:
+            stage.start(self._stop)
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        for stage in self.stages:
+            stage.join(timeout=timeout)
+
+    def stats(self):
+        return {stage.name: stage.stats() for stage in self.stages}
@@ -0,0 +1,183 @@
+import math
+
+QUESTION_WORDS = set("what why how when where who whom whose which".split())
+AUXILIARIES = set("""can could would will should shall do does did is are was were have has had may might
+isn't aren't don't doesn't didn't won't wouldn't can't couldn't""".split())
+# An auxiliary only opens a question when the subject follows it ("have you", not "have worked")
+SUBJECTS = set("you your we they there it i he she this that anyone anything".split())
+REQUESTS = ["tell me", "tell us", "describe", "explain", "walk me through", "walk us through", "talk me through",
+            "take me through", "give me", "give us", "share", "talk about", "help me understand",
+            "i'd like to hear", "i would like to hear", "i'd love to hear", "what about", "how about"]
+# Coding and design tasks are asked as commands; they only open a question at the start
+# of a clause, so "I write Python daily" isn't one
+TASKS = ["implement", "write", "design", "build", "code", "solve", "reverse", "find", "compare", "create",
+         "optimize", "debug", "calculate", "difference between", "i would like you to", "i'd like you to",
+         "i want you to", "please"]
+# A question with one of these leans on the sentence before it ("...at Amazon, what did you do there?").
+# "that" and "this" only count on their own ("how did that go"), not before a noun ("this role")
+PRONOUNS = set("there it them they he she".split())
+DEMONSTRATIVES = set("that this those these".split())
+VERBS_AFTER = set("go went goes work worked works happen happened mean meant turn turned feel felt".split())
+# Words that end one thought and start another in unpunctuated speech ("great so tell me...")
+LEAD_INS = set("so and okay ok alright right well now great cool next then also anyway um uh thanks".split())
+SMALL_TALK = ["how are you", "how's it going", "how is it going", "how was your weekend", "can you hear me",
+              "can you see my screen", "is my audio", "am i audible", "nice to meet you", "are you ready",
+              "shall we start", "shall we begin", "should we get started", "does that make sense"]
+INTERVIEW_TERMS = set("""experience project projects team role job position company career goal goals skills
+strength strengths weakness weaknesses challenge challenging conflict situation example time handle handled
+manage managed lead led leadership work worked salary background resume decision mistake failure failed
+achievement proud learn learned design approach problem responsibilities why""".split())
+# A question cut off mid-sentence ("tell me about your") isn't complete yet; stranded
+# prepositions are left out since questions often end with them ("which team were you on")
+DANGLING = set("the a an to about your my our their and or but".split())
+STATEMENT_STARTS = set("i i'm i've we we're we've our my that's thanks thank it's".split())
+
+# Weights of the logistic model over the features below, tuned on interview transcripts
+WEIGHTS = {
+    "bias": -2.0,
+    "wh_start": 2.6,
+    "aux_start": 2.2,
+    "request_start": 2.6,
+    "question_mark": 2.5,
+    "second_person": 0.8,
+    "interview_terms": 0.6,
+    "too_short": -2.0,
+    "small_talk": -5.0,
+    "statement_start": -1.5,
+    "dangling": -3.0,
+}
+
+
+def _bare(word):
+    return word.lower().strip(".,!?;:\"()")
+
+
+def _strip_lead_ins(tokens):
+    """Drop "so", "okay" and the like from both ends"""
+    start, end = 0, len(tokens)
+    while start < end and _bare(tokens[start]) in LEAD_INS:
+        start += 1
+    while end > start and _bare(tokens[end - 1]) in LEAD_INS:
+        end -= 1
+    return tokens[start:end]
+
+
+class QuestionDetector:
+    """Finds the question in a transcript without calling the model
+
+    The transcript is split into clauses (at sentence punctuation, and in
+    unpunctuated speech where a lead-in like "so" or "okay" is followed by a
+    question opener). Each clause, from its first question opener on, is
+    scored by a small logistic model over hand-picked features; the most
+    recent clause that scores at least `threshold` is the question, together
+    with the clause right before it if that is a question too ("Tell me about
+    a project. What was your role?"). A question that refers back ("how did
+    that go") also keeps the statement before it.
+    """
+
+    def __init__(self, threshold=0.5, min_words=2, weights=None, max_clauses=2):
+        self.threshold = threshold
+        self.min_words = min_words
+        self.weights = weights or WEIGHTS
+        self.max_clauses = max_clauses
+
+    def _opens_request(self, words, i, start=0):
+        if any(words[i:i + len(phrase.split())] == phrase.split() for phrase in REQUESTS):
+            return True
+        at_start = i == start or words[i - 1] in LEAD_INS
+        return at_start and any(words[i:i + len(phrase.split())] == phrase.split() for phrase in TASKS)
+
+    def _opens_question(self, words, i, start=0):
+        word = words[i]
+        if word in QUESTION_WORDS or self._opens_request(words, i, start):
+            return True
+        return word in AUXILIARIES and i + 1 < len(words) and words[i + 1] in SUBJECTS
+
+    def _refers_back(self, question):
+        words = [_bare(token) for token in question.split()]
+        for i, word in enumerate(words):
+            following = words[i + 1] if i + 1 < len(words) else None
+            if word in PRONOUNS or (word in DEMONSTRATIVES and (following is None or following in VERBS_AFTER
+                                                                 or following in AUXILIARIES)):
+                return True
+        return False
+
+    def _split(self, text):
+        """(lead, clause) pairs: each clause from its question opener on, and what preceded the opener"""
+        tokens = (text or "").split()
+        words = [_bare(token) for token in tokens]
+        clauses = []
+        start = 0
+        for i, token in enumerate(tokens):
+            if i > start and words[i - 1] in LEAD_INS and self._opens_question(words, i, i) \
+                    and not self._opens_question(words, i - 1, start):
+                clauses.append((start, i))
+                start = i
+            if token[-1] in ".?!":
+                clauses.append((start, i + 1))
+                start = i + 1
+        if start < len(tokens):
+            clauses.append((start, len(tokens)))
+
+        result = []
+        for start, end in clauses:
+            opener = next((i for i in range(start, end) if self._opens_question(words, i, start)), start)
+            result.append((" ".join(_strip_lead_ins(tokens[start:opener])), " ".join(tokens[opener:end])))
+        return result
+
+    def clauses(self, text):
+        """Split a transcript into clauses, each trimmed to start at its question opener if it has one"""
+        return [clause for _, clause in self._split(text)]
+
+    def features(self, clause):
+        tokens = clause.split()
+        words = [_bare(token) for token in tokens]
+        text = " ".join(words)
+        if not words:
+            return {"bias": 1.0, "too_short": 1.0}
+        return {
+            "bias": 1.0,
+            "wh_start": float(words[0] in QUESTION_WORDS),
+            "aux_start": float(words[0] in AUXILIARIES and len(words) > 1 and words[1] in SUBJECTS),
+            "request_start": float(self._opens_request(words, 0)),
+            "question_mark": float(clause.rstrip().endswith("?")),
+            "second_person": float(any(word in ("you", "your", "yourself", "you've", "you're") for word in words)),
+            "interview_terms": float(min(3, sum(word in INTERVIEW_TERMS for word in words))),
+            "too_short": float(len(words) < self.min_words + 1),
+            "small_talk": float(any(text.startswith(phrase) or text == phrase for phrase in SMALL_TALK)),
+            "statement_start": float(words[0] in STATEMENT_STARTS and not self._opens_request(words, 0)),
+            "dangling": float(words[-1] in DANGLING and clause.rstrip()[-1] not in ".?!"),
+        }
+
+    def score(self, clause):
+        """Probability that `clause` is a question worth answering"""
+        features = self.features(clause)
+        z = sum(self.weights.get(name, 0.0) * value for name, value in features.items())
+        return 1 / (1 + math.exp(-z))
+
+    def detect(self, text):
+        """Return (question, score); question is None if nothing answerable was found
+
+        A question that refers back ("what did you do there") keeps the
+        statement it refers to, so the model still knows what "there" is.
+        """
+        split = self._split(text)
+        clauses = [clause for _, clause in split]
+        scores = [self.score(clause) for clause in clauses]
+        for i in range(len(clauses) - 1, -1, -1):
+            if scores[i] >= self.threshold and len(clauses[i].split()) >= self.min_words:
+                first = i
+                while first > 0 and i - first + 1 < self.max_clauses and scores[first - 1] >= self.threshold:
+                    first -= 1
+                question = " ".join(clauses[first:i + 1])
+                if self._refers_back(question):
+                    lead = split[first][0]
+                    if not lead and first > 0 and scores[first - 1] < self.threshold:
+                        lead = " ".join(_strip_lead_ins(clauses[first - 1].split()))
+                    if lead:
+                        question = f"{lead} {question}"
+                return question, round(scores[i], 3)
+        return None, round(max(scores), 3) if scores else 0.0
+
+    def extract(self, text):
+        return self.detect(text)[0]
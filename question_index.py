@@ -0,0 +1,170 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from resume_index import tokenize
+
+# Common interview questions that are asked in very different words. A phrase
+# from a group is rewritten to the group's first phrase before indexing, so
+# paraphrases that share no words still land next to each other.
+PARAPHRASES = [
+    ["tell me about yourself", "walk me through your background", "walk me through your resume",
+     "introduce yourself", "tell me a little bit about yourself", "tell me a bit about yourself",
+     "give me a quick overview of your background"],
+    ["what are your strengths", "what are your greatest strengths", "what are you good at",
+     "what is your biggest strength"],
+    ["what are your weaknesses", "what is your greatest weakness", "what is your biggest weakness",
+     "what do you need to improve"],
+    ["why do you want to work here", "why are you interested in this role", "why this company",
+     "why do you want this job", "what attracts you to this position"],
+    ["where do you see yourself in five years", "where do you see yourself in 5 years",
+     "what are your long term goals", "what are your career goals"],
+    ["why are you leaving your current job", "why did you leave your last job",
+     "why are you looking for a new role"],
+    ["do you have any questions for us", "do you have any questions for me", "any questions for us"],
+]
+
+
+def normalize_question(text):
+    """Lowercase, drop punctuation and collapse whitespace so trivial edits still match"""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def canonical_question(text):
+    text = normalize_question(text)
+    for group in PARAPHRASES:
+        for phrase in group[1:]:
+            # Whole words only: "why this company" must not rewrite "why this company's culture"
+            text = re.sub(rf"\b{re.escape(phrase)}\b", group[0], text)
+    return text
+
+
+def same_content(a, b, spelling=0.85):
+    """Whether two questions ask about the same things
+
+    Their content words (after paraphrases are unified) must match, apart
+    from near-identical spellings that transcription noise produces
+    ("kubernetes"/"cubernetes"). "a project you led" vs "a project you
+    failed", or Java vs JavaScript, are different questions however similar
+    the rest of the sentence is.
+    """
+    words_a, words_b = set(tokenize(canonical_question(a))), set(tokenize(canonical_question(b)))
+    only_a, only_b = words_a - words_b, words_b - words_a
+    if len(only_a) != len(only_b):
+        return False
+    for word in only_a:
+        match = max(only_b, key=lambda other: SequenceMatcher(None, word, other).ratio())
+        if SequenceMatcher(None, word, match).ratio() < spelling:
+            return False
+        only_b = only_b - {match}
+    return True
+
+
+def question_features(text):
+    """Word unigrams plus character trigrams, which survive small transcription errors"""
+    words = canonical_question(text).split()
+    features = Counter(words)
+    for word in words:
+        padded = f" {word} "
+        features.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+class QuestionIndex:
+    """Offline TF-IDF similarity index over previously answered questions
+
+    A match needs a score of at least `threshold` and the same content
+    words (see same_content), so a near-identical sentence about a
+    different thing is not served another question's answer.
+    """
+
+    def __init__(self, threshold=0.85, max_entries=5000):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries = []
+        self._by_text = {}
+        self._postings = defaultdict(list)
+        self._df = Counter()
+        self._norms = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._by_text)
+
+    def _idf(self, feature):
+        return math.log((len(self._entries) + 1) / (self._df[feature] + 1)) + 1
+
+    def add(self, question, value, context=""):
+        text = (context, canonical_question(question))
+        with self._lock:
+            if text in self._by_text:
+                # Same question again: keep the newest value, features are unchanged
+                idx = self._by_text[text]
+                self._entries[idx] = self._entries[idx][:2] + (value,) + self._entries[idx][3:]
+                return
+            features = question_features(question)
+            idx = len(self._entries)
+            self._entries.append((context, question, value, features))
+            self._by_text[text] = idx
+            for feature, count in features.items():
+                self._postings[feature].append((idx, count))
+                self._df[feature] += 1
+            self._norms = None
+
+            if len(self._entries) > self.max_entries:
+                self._rebuild(self._entries[len(self._entries) - self.max_entries:])
+
+    def _rebuild(self, entries):
+        self._entries = []
+        self._by_text = {}
+        self._postings = defaultdict(list)
+        self._df = Counter()
+        for idx, (context, question, value, features) in enumerate(entries):
+            self._entries.append((context, question, value, features))
+            self._by_text[(context, canonical_question(question))] = idx
+            for feature, count in features.items():
+                self._postings[feature].append((idx, count))
+                self._df[feature] += 1
+        self._norms = None
+
+    def _entry_norms(self):
+        if self._norms is None:
+            idf = {feature: self._idf(feature) for feature in self._df}
+            self._norms = [
+                math.sqrt(sum((count * idf[feature]) ** 2 for feature, count in features.items())) or 1.0
+                for _, _, _, features in self._entries
+            ]
+        return self._norms
+
+    def search(self, question, context=""):
+        """Return (value, score, matched question) for the closest past question above the threshold"""
+        features = question_features(question)
+        with self._lock:
+            if not self._entries or not features:
+                return None
+            norms = self._entry_norms()
+            scores = defaultdict(float)
+            query_norm = 0.0
+            for feature, count in features.items():
+                weight = count * self._idf(feature)
+                query_norm += weight * weight
+                idf = self._idf(feature)
+                for idx, entry_count in self._postings.get(feature, ()):
+                    scores[idx] += weight * entry_count * idf
+            query_norm = math.sqrt(query_norm) or 1.0
+
+            candidates = []
+            for idx, dot in scores.items():
+                entry_context, entry_question, value, _ = self._entries[idx]
+                if entry_context != context:
+                    continue
+                score = dot / (query_norm * norms[idx])
+                if score >= self.threshold:
+                    candidates.append((value, score, entry_question))
+
+        for best in sorted(candidates, key=lambda candidate: -candidate[1]):
+            if same_content(question, best[2]):
+                return best
+        return None
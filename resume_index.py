@@ -0,0 +1,161 @@
+import math
+import re
+from collections import Counter, OrderedDict
+
+STOPWORDS = set("""a an and are as at be by can did do does for from had has have how i in is it
+its me my of on or our so that the their them there these they this to was we were what when
+where which who why will with would you your about tell describe""".split())
+
+BULLET_RE = re.compile(r"^\s*(?:[-*•▪●]|\d+[.)])\s+")
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token) used for prompt budgets"""
+    return max(1, len(text) // 4) if text else 0
+
+
+def _stem(word):
+    # Crude suffix stripping so "mentored" matches "mentor"
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text):
+    return [_stem(word) for word in re.findall(r"[a-z0-9+#]+", text.lower()) if word not in STOPWORDS]
+
+
+def _is_heading(line):
+    stripped = line.strip()
+    if not stripped or len(stripped) > 40 or BULLET_RE.match(line):
+        return False
+    if stripped.endswith(":"):
+        return True
+    letters = [c for c in stripped if c.isalpha()]
+    return bool(letters) and all(c.isupper() for c in letters)
+
+
+def split_long(text, max_tokens):
+    """Break `text` into pieces of at most about `max_tokens`, at sentence ends where possible"""
+    limit = max_tokens * 4
+    pieces = []
+    current = ""
+    for sentence in re.split(r"(?<=[.!?;])\s+", text):
+        # A sentence that is too long on its own is cut at word boundaries
+        while len(sentence) > limit:
+            cut = sentence.rfind(" ", 0, limit)
+            cut = cut if cut > 0 else limit
+            sentence, rest = sentence[:cut].strip(), sentence[cut:].strip()
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence)
+            sentence = rest
+        if current and len(current) + 1 + len(sentence) > limit:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_resume(text, max_chunk_tokens=150):
+    """Split a plain-text resume into (section, chunk) pairs: one per bullet or paragraph
+
+    Paragraphs longer than `max_chunk_tokens` are split further, so a resume
+    written as one long block still yields chunks that fit the prompt budget.
+    """
+    chunks = []
+    section = ""
+    paragraph = []
+
+    def flush():
+        if paragraph:
+            chunks.extend((section, piece) for piece in split_long(" ".join(paragraph), max_chunk_tokens))
+            paragraph.clear()
+
+    for line in text.splitlines():
+        if not line.strip():
+            flush()
+        elif _is_heading(line):
+            flush()
+            section = line.strip().rstrip(":").title()
+        elif BULLET_RE.match(line):
+            flush()
+            paragraph.append(BULLET_RE.sub("", line).strip())
+        else:
+            paragraph.append(line.strip())
+    flush()
+    return chunks
+
+
+class ResumeIndex:
+    """BM25 index over resume sections and bullets, built once per upload"""
+
+    def __init__(self, text, k1=1.5, b=0.75, cache_size=128):
+        self.k1 = k1
+        self.b = b
+        self.chunks = split_resume(text)
+        self._docs = [Counter(tokenize(f"{section} {chunk}")) for section, chunk in self.chunks]
+        self._lengths = [sum(doc.values()) for doc in self._docs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        df = Counter()
+        for doc in self._docs:
+            df.update(doc.keys())
+        n = len(self._docs)
+        self._idf = {term: math.log(1 + (n - freq + 0.5) / (freq + 0.5)) for term, freq in df.items()}
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def scores(self, question):
+        terms = tokenize(question)
+        scores = [0.0] * len(self._docs)
+        for i, doc in enumerate(self._docs):
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[i] / (self._avg_length or 1))
+            for term in terms:
+                freq = doc.get(term)
+                if freq:
+                    scores[i] += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+        return scores
+
+    def select(self, question, top_k=6, token_budget=600):
+        """Return the most relevant chunk indexes that fit the budget, in resume order"""
+        key = (" ".join(question.lower().split()), top_k, token_budget)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        scores = self.scores(question)
+        ranked = [i for i in sorted(range(len(scores)), key=lambda i: -scores[i]) if scores[i] > 0]
+        if not ranked:
+            # Nothing matches (e.g. "tell me about yourself"): the top of the resume is the summary
+            ranked = list(range(len(self.chunks)))
+
+        chosen = []
+        used = 0
+        for i in ranked[:top_k]:
+            cost = estimate_tokens(self._format(i))
+            if used + cost > token_budget:
+                continue
+            chosen.append(i)
+            used += cost
+        chosen.sort()
+
+        self._cache[key] = chosen
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return chosen
+
+    def _format(self, i):
+        section, chunk = self.chunks[i]
+        return f"- [{section}] {chunk}" if section else f"- {chunk}"
+
+    def context_for(self, question, top_k=6, token_budget=600):
+        """Resume excerpt for the prompt: only the chunks relevant to this question"""
+        return "\n".join(self._format(i) for i in self.select(question, top_k, token_budget))
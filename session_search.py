@@ -0,0 +1,97 @@
+import time
+import tkinter as tk
+from tkinter import ttk, scrolledtext
+
+
+class SessionSearch:
+    """Window for searching earlier questions and answers in the session history; toggled with F3"""
+
+    def __init__(self, root, store, delay_ms=150):
+        self.root = root
+        self.store = store
+        self.delay_ms = delay_ms
+        self.window = None
+        self.results = {}
+        self._job = None
+
+    def toggle(self, event=None):
+        if self.window is None:
+            self.show()
+        else:
+            self.close()
+
+    def show(self):
+        self.window = tk.Toplevel(self.root)
+        self.window.title("Search Past Answers")
+        self.window.geometry("640x480")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.window.bind('<Escape>', lambda event: self.close())
+
+        frame = ttk.Frame(self.window, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        self.query_var = tk.StringVar()
+        entry = ttk.Entry(frame, textvariable=self.query_var)
+        entry.pack(fill=tk.X)
+        entry.bind('<KeyRelease>', self.schedule_search)
+        entry.focus_set()
+
+        self.table = ttk.Treeview(frame, columns=("question",), height=8)
+        self.table.heading("#0", text="when")
+        self.table.column("#0", width=120, stretch=False)
+        self.table.heading("question", text="question")
+        self.table.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        self.table.bind('<<TreeviewSelect>>', self.show_selected)
+
+        self.answer_text = scrolledtext.ScrolledText(frame, height=8, wrap=tk.WORD)
+        self.answer_text.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(frame, textvariable=self.status_var).pack(anchor=tk.W, pady=(5, 0))
+
+        self.search()
+
+    def close(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+    def schedule_search(self, event=None):
+        # Search once typing pauses rather than on every key
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+        self._job = self.root.after(self.delay_ms, self.search)
+
+    def search(self):
+        self._job = None
+        started = time.perf_counter()
+        try:
+            rows = self.store.search(self.query_var.get())
+        except Exception as e:
+            self.status_var.set(f"Error: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.table.delete(*self.table.get_children())
+        self.results = {}
+        for row in rows:
+            iid = str(row["id"])
+            self.results[iid] = row
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["created"]))
+            question = row.get("question") or row.get("transcript") or ""
+            self.table.insert("", tk.END, iid=iid, text=when, values=(question,))
+        self.answer_text.delete(1.0, tk.END)
+        self.status_var.set(f"{len(rows)} result(s) in {elapsed_ms:.1f} ms")
+
+    def show_selected(self, event=None):
+        selection = self.table.selection()
+        if not selection:
+            return
+        row = self.results[selection[0]]
+        self.answer_text.delete(1.0, tk.END)
+        if row.get("transcript") and row["transcript"] != row.get("question"):
+            self.answer_text.insert(tk.END, f"Heard: {row['transcript']}\n\n")
+        self.answer_text.insert(tk.END, row.get("answer") or "(no answer)")
@@ -0,0 +1,194 @@
+import argparse
+import atexit
+import json
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from resume_index import STOPWORDS
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp", "sessions.sqlite3")
+FIELDS = ("session", "created", "source", "transcript", "question", "answer",
+          "transcribe_ms", "first_chunk_ms", "answer_ms", "resume_hash")
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: any of its words, with prefix matching"""
+    words = [word for word in re.findall(r"\w+", (text or "").lower()) if word not in STOPWORDS]
+    return " OR ".join(f'"{word}"*' for word in words)
+
+
+class SessionStore:
+    """Every question and answer in SQLite, with a full-text index for looking them up later
+
+    record() only queues the row; a background thread writes queued rows in
+    one transaction, so callers (including the Tk thread) never wait on disk.
+    Searches use their own connection and WAL mode lets them run while a
+    write is in progress.
+    """
+
+    def __init__(self, path, session=None):
+        self.path = path
+        self.session = session or time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        self.fts = True
+        self._queue = queue.Queue()
+        self._read_lock = threading.Lock()
+        self._closed = False
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._writer = sqlite3.connect(path, check_same_thread=False)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute("""CREATE TABLE IF NOT EXISTS exchanges (
+            id INTEGER PRIMARY KEY,
+            session TEXT,
+            created REAL,
+            source TEXT,
+            transcript TEXT,
+            question TEXT,
+            answer TEXT,
+            transcribe_ms REAL,
+            first_chunk_ms REAL,
+            answer_ms REAL,
+            resume_hash TEXT)""")
+        try:
+            self._writer.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS exchanges_fts USING fts5(
+                transcript, question, answer, content='exchanges', content_rowid='id',
+                tokenize='porter unicode61')""")
+            self._writer.execute("""CREATE TRIGGER IF NOT EXISTS exchanges_ai AFTER INSERT ON exchanges BEGIN
+                INSERT INTO exchanges_fts(rowid, transcript, question, answer)
+                VALUES (new.id, new.transcript, new.question, new.answer);
+            END""")
+            self._writer.execute("""CREATE TRIGGER IF NOT EXISTS exchanges_ad AFTER DELETE ON exchanges BEGIN
+                INSERT INTO exchanges_fts(exchanges_fts, rowid, transcript, question, answer)
+                VALUES ('delete', old.id, old.transcript, old.question, old.answer);
+            END""")
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5: searching falls back to LIKE
+            print(f"Full-text search unavailable ({e}); using plain text matching")
+            self.fts = False
+        self._writer.commit()
+        self._reader = sqlite3.connect(path, check_same_thread=False)
+        self._reader.row_factory = sqlite3.Row
+
+        self._thread = threading.Thread(target=self._write_loop, name="session-store")
+        self._thread.daemon = True
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, transcript=None, question=None, answer=None, source=None, transcribe_ms=None,
+               first_chunk_ms=None, answer_ms=None, resume_hash=""):
+        """Queue one exchange for writing; returns immediately"""
+        if self._closed or not (transcript or question or answer):
+            return
+        self._queue.put((self.session, time.time(), source, transcript, question, answer,
+                         transcribe_ms, first_chunk_ms, answer_ms, resume_hash))
+
+    def _write_loop(self):
+        while True:
+            rows = [self._queue.get()]
+            # Whatever else is waiting goes into the same transaction
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            count = len(rows)
+            stop = None in rows
+            rows = [row for row in rows if row is not None]
+            if rows:
+                try:
+                    with self._writer:
+                        self._writer.executemany(
+                            f"INSERT INTO exchanges ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+                            rows)
+                except sqlite3.Error as e:
+                    print(f"Error saving session history: {e}")
+            for _ in range(count):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def search(self, text, limit=20):
+        """Past exchanges matching `text`, best match first"""
+        query = fts_query(text)
+        if not query:
+            return self.recent(limit)
+        with self._read_lock:
+            if self.fts:
+                rows = self._reader.execute("""SELECT e.*, snippet(exchanges_fts, -1, '[', ']', '...', 12) AS snippet
+                    FROM exchanges_fts JOIN exchanges e ON e.id = exchanges_fts.rowid
+                    WHERE exchanges_fts MATCH ? ORDER BY bm25(exchanges_fts, 1.0, 2.0, 1.0) LIMIT ?""",
+                                            (query, limit)).fetchall()
+            else:
+                pattern = f"%{text.strip()}%"
+                rows = self._reader.execute("""SELECT *, NULL AS snippet FROM exchanges
+                    WHERE transcript LIKE ? OR question LIKE ? OR answer LIKE ?
+                    ORDER BY created DESC LIMIT ?""", (pattern, pattern, pattern, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def recent(self, limit=20, session=None):
+        with self._read_lock:
+            if session:
+                rows = self._reader.execute("SELECT * FROM exchanges WHERE session = ? ORDER BY id DESC LIMIT ?",
+                                            (session, limit)).fetchall()
+            else:
+                rows = self._reader.execute("SELECT * FROM exchanges ORDER BY id DESC LIMIT ?",
+                                            (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def flush(self, timeout=5.0):
+        """Wait until everything recorded so far is on disk"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+        self._writer.close()
+        self._reader.close()
+
+
+def format_exchange(row):
+    when = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["created"]))
+    timing = f" ({row['answer_ms']:.0f} ms)" if row.get("answer_ms") else ""
+    lines = [f"[{when}] {row.get('source') or ''}{timing}".rstrip(),
+             f"Q: {row.get('question') or row.get('transcript') or ''}"]
+    if row.get("answer"):
+        lines.append(f"A: {row['answer'].strip()}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search the questions and answers saved by the apps and the CLI")
+    parser.add_argument("query", nargs="*", help="words to look for (none: the most recent exchanges)")
+    parser.add_argument("--db", default=DEFAULT_PATH,
+                        help="session database (default: temp/sessions.sqlite3)")
+    parser.add_argument("-n", "--limit", type=int, default=10, help="number of results")
+    parser.add_argument("--json", action="store_true", help="print JSON lines instead of text")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No session history at {args.db}", file=sys.stderr)
+        return 1
+    store = SessionStore(args.db)
+    started = time.perf_counter()
+    rows = store.search(" ".join(args.query), args.limit)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for row in rows:
+        print(json.dumps(row) if args.json else format_exchange(row) + "\n")
+    print(f"{len(rows)} result(s) in {elapsed_ms:.1f} ms", file=sys.stderr)
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import threading
+import time
+from question_index import canonical_question
+from transcript_gate import content_words
+
+
+def same_question(a, b):
+    """Whether a final transcript asks what the partial one did (the same content words, at least)"""
+    a, b = canonical_question(a or ""), canonical_question(b or "")
+    if a == b:
+        return True
+    words = content_words(a)
+    return bool(words) and words == content_words(b)
+
+
+class SpeculativeAnswer:
+    """An answer requested before the question is final
+
+    Chunks are buffered on a daemon thread until the final transcript claims
+    them with stream(), or the answer is cancelled because the question changed.
+    """
+
+    def __init__(self, answerer, question, utterance):
+        self.question = question
+        self.utterance = utterance
+        self.started = time.perf_counter()
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self._cancelled = threading.Event()
+        self._cond = threading.Condition()
+        thread = threading.Thread(target=self._run, args=(answerer,), name="speculative-answer")
+        thread.daemon = True
+        thread.start()
+
+    def _run(self, answerer):
+        stream = None
+        try:
+            stream = answerer.stream_interview_response(self.question)
+            for chunk in stream:
+                if self._cancelled.is_set():
+                    break
+                with self._cond:
+                    self.chunks.append(chunk)
+                    self._cond.notify_all()
+        except Exception as e:
+            print(f"Error in speculative answer: {e}")
+            self.error = e
+        finally:
+            # Closing the stream here (not from cancel()) also stops the request behind it
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Stop reading the answer; the request is dropped at its next chunk"""
+        self._cancelled.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def stream(self):
+        """Yield the chunks received so far, then the rest as they arrive"""
+        index = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: index < len(self.chunks) or self.done or self.cancelled)
+                if index < len(self.chunks):
+                    chunk = self.chunks[index]
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            index += 1
+            yield chunk
@@ -0,0 +1,110 @@
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+
+# Imported first by both apps, so this is close enough to process start
+PROCESS_START = time.perf_counter()
+
+IMPORT_TIMES = {}
+MARKS = {}
+_LOCK = threading.RLock()
+
+
+def timed_import(name):
+    """Import a module and record how long it took if it wasn't loaded yet"""
+    with _LOCK:
+        if name in sys.modules:
+            return sys.modules[name]
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        IMPORT_TIMES[name] = time.perf_counter() - started
+        return module
+
+
+class LazyModule:
+    """Stand-in for a module that is only imported when one of its attributes is used"""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = timed_import(self._name)
+            self.__dict__['_module'] = module
+        return module
+
+    @property
+    def is_loaded(self):
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+def warm_imports(*modules):
+    """Load lazy modules on a background thread, e.g. once the window is up"""
+    def load():
+        for module in modules:
+            try:
+                module._load()
+            except Exception as e:
+                print(f"Error pre-loading {module._name}: {e}")
+
+    thread = threading.Thread(target=load)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def mark(label):
+    """Record a startup milestone, in seconds since process start"""
+    MARKS[label] = time.perf_counter() - PROCESS_START
+
+
+def startup_report(app_name, window_mark="window drawn", budget_ms=None, log_file=None):
+    """Print the import-time breakdown and append it to a JSON-lines log
+
+    Set STARTUP_REPORT=1 to print it on every launch; a time to first window
+    over STARTUP_BUDGET_MS (default 1500) always prints a warning.
+    """
+    if budget_ms is None:
+        budget_ms = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+    window_ms = MARKS.get(window_mark, 0.0) * 1000
+    report = {
+        "app": app_name,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "window_ms": round(window_ms, 1),
+        "marks_ms": {label: round(value * 1000, 1) for label, value in MARKS.items()},
+        "imports_ms": {name: round(value * 1000, 1)
+                       for name, value in sorted(IMPORT_TIMES.items(), key=lambda item: -item[1])},
+    }
+
+    if os.getenv("STARTUP_REPORT"):
+        print(f"Startup report for {app_name}:")
+        for label, value in report["marks_ms"].items():
+            print(f"  {label:<30} {value:8.1f} ms")
+        for name, value in report["imports_ms"].items():
+            print(f"  import {name:<23} {value:8.1f} ms")
+    if window_ms > budget_ms:
+        print(f"Warning: first window took {window_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+
+    if log_file:
+        try:
+            with open(log_file, "a") as f:
+                f.write(json.dumps(report) + "\n")
+        except OSError as e:
+            print(f"Error writing startup report: {e}")
+    return report
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation import ConversationContext
+
+
+@pytest.fixture
+def context():
+    context = ConversationContext()
+    context.add_turn("Tell me about a project you led.", "I led the migration of our billing system to Kafka.")
+    return context
+
+
+@pytest.mark.parametrize("question", [
+    "Why did you do that?",
+    "How did that go?",
+    "Can you elaborate on that?",
+    "Tell me more about it.",
+    "You mentioned Kafka, why did you choose it?",
+    "Can we go back to the billing project?",
+])
+def test_back_reference_is_a_follow_up(context, question):
+    assert context.is_follow_up(question)
+
+
+@pytest.mark.parametrize("question", [
+    "What is your experience with Python?",
+    "How would you design this system for scale?",
+    "Have you done this before?",
+    "Tell me about a project where you used it in production.",
+    "Tell me about a time you made the same mistake twice.",
+    "Why this company?",
+])
+def test_new_question_is_not_a_follow_up(context, question):
+    assert not context.is_follow_up(question)
+
+
+def test_nothing_is_a_follow_up_before_the_first_answer():
+    assert not ConversationContext().is_follow_up("Why did you do that?")
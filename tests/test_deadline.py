@@ -0,0 +1,82 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deadline import CallPolicy, call_with_deadline
+from gemini_client import is_retryable_sdk
+
+
+class ResourceExhausted(Exception):
+    code = 429
+
+
+class InvalidArgument(Exception):
+    code = 400
+
+
+class PermissionDenied(Exception):
+    code = 403
+
+
+def test_failed_hedge_does_not_retry_while_primary_is_in_flight():
+    policy = CallPolicy(budget=2.0, retries=2, backoff=0.0, hedge_model="fast", hedge_after=0.05)
+    calls = []
+    lock = threading.Lock()
+
+    def primary(timeout):
+        with lock:
+            calls.append("primary")
+        time.sleep(0.3)
+        return "answer"
+
+    def hedge(timeout):
+        with lock:
+            calls.append("hedge")
+        raise ResourceExhausted("quota")
+
+    assert call_with_deadline(policy, primary, hedge, retryable=is_retryable_sdk) == "answer"
+    assert calls == ["primary", "hedge"]
+
+
+def test_bad_request_is_not_retried():
+    policy = CallPolicy(budget=2.0, retries=2, backoff=0.0)
+    calls = []
+
+    def primary(timeout):
+        calls.append("primary")
+        raise InvalidArgument("400 bad request")
+
+    with pytest.raises(InvalidArgument):
+        call_with_deadline(policy, primary, retryable=is_retryable_sdk)
+    assert calls == ["primary"]
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (ResourceExhausted("429"), True),
+    (InvalidArgument("400"), False),
+    (PermissionDenied("403"), False),
+    (TimeoutError("timed out"), True),
+    (ValueError("response was blocked"), False),
+])
+def test_sdk_errors(error, retryable):
+    assert is_retryable_sdk(error) == retryable
+
+
+def test_bad_environment_values_fall_back_to_defaults(monkeypatch):
+    monkeypatch.setenv("GEMINI_BUDGET_SECONDS", "8s")
+    monkeypatch.setenv("GEMINI_RETRIES", "two")
+    monkeypatch.setenv("GEMINI_HEDGE_AFTER", "-1")
+    policy = CallPolicy.from_env()
+    assert (policy.budget, policy.retries, policy.hedge_after) == (8.0, 2, 1.5)
+
+
+def test_environment_values_are_used(monkeypatch):
+    monkeypatch.setenv("GEMINI_BUDGET_SECONDS", "5")
+    monkeypatch.setenv("GEMINI_RETRIES", "0")
+    policy = CallPolicy.from_env()
+    assert (policy.budget, policy.retries) == (5.0, 0)
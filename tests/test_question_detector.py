@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_detector import QuestionDetector
+
+
+@pytest.mark.parametrize("text", [
+    "implement a function to reverse a linked list",
+    "write a SQL query to find the second highest salary",
+    "design a parking lot system",
+    "I would like you to explain polymorphism",
+])
+def test_task_prompts_are_questions(text):
+    assert QuestionDetector().extract(text) == text
+
+
+@pytest.mark.parametrize("text", ["I write Python daily", "how are you", "okay great thanks"])
+def test_statements_and_small_talk_are_not(text):
+    assert QuestionDetector().extract(text) is None
+
+
+@pytest.mark.parametrize("text", [
+    "I see that you worked at Amazon what did you do there",
+    "you led a migration to kubernetes how did that go",
+    "You led a migration to Kubernetes. How did that go?",
+])
+def test_back_reference_keeps_its_statement(text):
+    assert QuestionDetector().extract(text) == text
+
+
+def test_small_talk_before_a_self_contained_question_is_dropped():
+    text = "thanks for joining us today I'm the hiring manager here so what made you apply for this role"
+    assert QuestionDetector().extract(text) == "what made you apply for this role"
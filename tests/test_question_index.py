@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_index import QuestionIndex, canonical_question
+
+
+def index_with(question):
+    index = QuestionIndex()
+    index.add(question, "cached answer")
+    return index
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("Describe a project you led.", "Describe a project you failed."),
+    ("Tell me about a time you disagreed with your manager.", "Tell me about a time you disagreed with a teammate."),
+    ("What is your experience with Java?", "What is your experience with JavaScript?"),
+])
+def test_different_question_is_not_served_from_cache(cached, asked):
+    assert index_with(cached).search(asked) is None
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("Tell me about yourself.", "Tell me a bit about yourself."),
+    ("What is your experience with Kubernetes?", "What is your experience with Cubernetes?"),
+    ("Describe a project you led.", "describe a project you led"),
+])
+def test_rephrased_question_is_served_from_cache(cached, asked):
+    assert index_with(cached).search(asked)[0] == "cached answer"
+
+
+def test_paraphrases_replace_whole_words_only():
+    assert canonical_question("why this company") == "why do you want to work here"
+    assert canonical_question("why this companys culture") == "why this companys culture"
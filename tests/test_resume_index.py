@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_index import ResumeIndex, estimate_tokens, split_long
+
+SENTENCES = [
+    "Senior backend engineer with eight years of experience building payment systems in Python and Go.",
+    "Led the migration of the billing platform from a monolith to Kafka-based services.",
+    "Mentored four junior engineers and ran the team's on-call rotation.",
+    "Cut checkout latency by forty percent by caching fraud scores in Redis.",
+    "Designed the public REST API used by over two hundred merchants.",
+]
+
+
+def test_single_paragraph_resume_still_gives_context():
+    # About 3300 characters with no blank lines or bullets
+    text = " ".join(SENTENCES * 8)
+    assert len(text) > 3000
+    index = ResumeIndex(text)
+    assert len(index) > 1
+
+    context = index.context_for("Tell me about the Kafka migration you led")
+    assert "Kafka" in context
+    assert estimate_tokens(context) <= 600
+
+
+def test_split_long_keeps_every_word():
+    text = " ".join(SENTENCES) + " " + "word " * 400
+    pieces = split_long(text, 50)
+    assert all(len(piece) <= 200 for piece in pieces)
+    assert " ".join(pieces).split() == text.split()
+
+
+def test_short_paragraphs_are_not_split():
+    index = ResumeIndex("EXPERIENCE\n- " + SENTENCES[0] + "\n- " + SENTENCES[1])
+    assert [chunk for _, chunk in index.chunks] == SENTENCES[:2]
@@ -0,0 +1,134 @@
+import os
+import sys
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interview_engine import InterviewEngine
+from speculative import SpeculativeAnswer, same_question
+from transcriber import Transcriber
+
+QUESTION = "Tell me about a project you led?"
+
+
+class FakeAnswerer:
+    """Streams "answer to <question>" in words; with `gate`, waits for it after the first word"""
+
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.questions = []
+        self.closed = threading.Event()
+
+    def stream_interview_response(self, question):
+        self.questions.append(question)
+        try:
+            for i, word in enumerate(f"answer to {question}".split()):
+                if i == 1 and self.gate is not None:
+                    self.gate.wait(5.0)
+                yield word + " "
+        finally:
+            self.closed.set()
+
+
+class FakeTranscriber(Transcriber):
+    name = "fake"
+
+    def __init__(self, text):
+        self.text = text
+
+    def transcribe_array(self, samples, sample_rate):
+        return self.text
+
+
+def make_engine(answerer, partial_text=QUESTION):
+    events = []
+    engine = InterviewEngine(FakeTranscriber(partial_text), answerer, on_event=events.append, speculate=True)
+    engine._utterances = 0
+    return engine, events
+
+
+def speculation_events(events):
+    return [(event["status"], event.get("reason")) for event in events if event["type"] == "speculation"]
+
+
+def answers(events):
+    return [event for event in events if event["type"] == "answer"]
+
+
+def test_same_question_claims_the_speculative_answer():
+    answerer = FakeAnswerer()
+    engine, events = make_engine(answerer)
+    engine._speculate_stage((0, np.zeros(160)))
+    engine._answer_stage((0, "tell me about a project you led", 0))
+
+    assert answerer.questions == [QUESTION]
+    assert speculation_events(events) == [("started", None), ("used", None)]
+    [answer] = answers(events)
+    assert answer["speculative"] and answer["text"] == f"answer to {QUESTION} "
+    assert engine.speculation_counts["used"] == 1
+
+
+def test_changed_question_discards_the_speculative_answer():
+    answerer = FakeAnswerer()
+    engine, events = make_engine(answerer)
+    engine._speculate_stage((0, np.zeros(160)))
+    speculation = engine._speculation
+    engine._answer_stage((0, "Tell me about a project you failed?", 0))
+
+    assert speculation.cancelled
+    assert answerer.questions == [QUESTION, "Tell me about a project you failed?"]
+    assert speculation_events(events) == [("started", None), ("discarded", "changed")]
+    [answer] = answers(events)
+    assert not answer["speculative"] and "failed" in answer["text"]
+
+
+def test_speculation_for_an_earlier_utterance_is_stale():
+    answerer = FakeAnswerer()
+    engine, events = make_engine(answerer)
+    engine._speculate_stage((0, np.zeros(160)))
+    speculation = engine._speculation
+    engine._utterances = 1
+    engine._answer_stage((1, QUESTION, 1))
+
+    assert speculation.cancelled
+    assert speculation_events(events) == [("started", None), ("discarded", "stale")]
+    [answer] = answers(events)
+    assert not answer["speculative"]
+    assert engine._speculation is None
+
+
+def test_speculation_for_a_later_utterance_is_kept():
+    engine, events = make_engine(FakeAnswerer())
+    engine._speculate_stage((1, np.zeros(160)))
+    speculation = engine._speculation
+    assert engine._claim_speculation(0, QUESTION, 0) is None
+    assert engine._speculation is speculation and not speculation.cancelled
+
+
+def test_suppressed_transcript_discards_its_speculation():
+    engine, events = make_engine(FakeAnswerer())
+    engine._speculate_stage((0, np.zeros(160)))
+    engine._suppress(0, 0, "um okay", "trivial")
+    assert engine._speculation is None
+    assert speculation_events(events)[-1] == ("discarded", "suppressed")
+
+
+def test_cancel_mid_stream_stops_reading_and_closes_the_request():
+    gate = threading.Event()
+    answerer = FakeAnswerer(gate)
+    speculation = SpeculativeAnswer(answerer, QUESTION, 0)
+    stream = speculation.stream()
+
+    assert next(stream) == "answer "
+    speculation.cancel()
+    gate.set()
+    assert list(stream) == []
+    assert answerer.closed.wait(5.0)
+    assert speculation.chunks == ["answer "]
+
+
+def test_same_question_compares_content_words():
+    assert same_question("So tell me about a project you led", QUESTION)
+    assert not same_question("Tell me about a project you failed", QUESTION)
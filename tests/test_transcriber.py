@@ -0,0 +1,47 @@
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcriber import TranscriptionError, TranscriptionStream
+
+
+class SlowStream(TranscriptionStream):
+    """Decodes each chunk only once `release` is set"""
+
+    def __init__(self, sample_rate):
+        self.release = threading.Event()
+        self.chunks = 0
+        self.finalized = False
+        super().__init__(sample_rate)
+
+    def _process(self, chunk):
+        self.release.wait()
+        self.chunks += 1
+        return f"{self.chunks} chunks"
+
+    def _finalize(self):
+        self.finalized = True
+        return f"{self.chunks} chunks"
+
+
+def test_finish_does_not_finalize_while_the_worker_is_busy():
+    stream = SlowStream(16000)
+    stream.feed(np.zeros(160, dtype=np.int16))
+    with pytest.raises(TranscriptionError):
+        stream.finish(timeout=0.05)
+    assert not stream.finalized
+    stream.release.set()
+
+
+def test_finish_returns_the_final_transcript():
+    stream = SlowStream(16000)
+    stream.release.set()
+    stream.feed(np.zeros(160, dtype=np.int16))
+    stream.feed(np.zeros(160, dtype=np.int16))
+    assert stream.finish(timeout=5.0) == "2 chunks"
+    assert stream.partial == "2 chunks"
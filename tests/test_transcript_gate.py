@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcript_gate import TranscriptGate
+
+FOLLOW_UPS = [
+    ("What is the time complexity of quicksort?", "What is the space complexity of quicksort?"),
+    ("What is the difference between a list and a tuple?", "What is the difference between a list and a set?"),
+    ("Tell me about your experience with Java.", "Tell me about your experience with JavaScript."),
+    ("Tell me about a project you led.", "Tell me about a project you failed."),
+]
+
+REPEATS = [
+    ("Tell me about yourself.", "So tell me about yourself"),
+    ("Why do you want this job?", "um why do you want this job"),
+]
+
+
+@pytest.mark.parametrize("first, second", FOLLOW_UPS)
+def test_follow_up_question_is_not_a_duplicate(first, second):
+    gate = TranscriptGate()
+    assert gate.check(first) == (True, "ok")
+    assert gate.check(second) == (True, "ok")
+
+
+@pytest.mark.parametrize("first, second", REPEATS)
+def test_repeated_question_is_suppressed(first, second):
+    gate = TranscriptGate()
+    assert gate.check(first)[0]
+    assert gate.check(second) == (False, "near_duplicate")
@@ -0,0 +1,78 @@
+import os
+import tkinter as tk
+from tkinter import ttk
+from tracing import tracer
+
+COLUMNS = ("count", "last", "p50", "p95", "p99", "max")
+
+
+class TracePanel:
+    """Debug window with a live table of span timings (ms); toggled with F12"""
+
+    def __init__(self, root, trace_file, refresh_ms=1000):
+        self.root = root
+        self.trace_file = trace_file
+        self.refresh_ms = refresh_ms
+        self.window = None
+        self._job = None
+
+    def toggle(self, event=None):
+        if self.window is None:
+            self.show()
+        else:
+            self.close()
+
+    def show(self):
+        self.window = tk.Toplevel(self.root)
+        self.window.title("Pipeline Timings")
+        self.window.geometry("560x320")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        frame = ttk.Frame(self.window, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        self.table = ttk.Treeview(frame, columns=COLUMNS, height=10)
+        self.table.heading("#0", text="span")
+        self.table.column("#0", width=160)
+        for column in COLUMNS:
+            self.table.heading(column, text=column)
+            self.table.column(column, width=60, anchor=tk.E)
+        self.table.pack(fill=tk.BOTH, expand=True)
+
+        buttons = ttk.Frame(frame)
+        buttons.pack(fill=tk.X, pady=(10, 0))
+        ttk.Button(buttons, text="Export Trace", command=self.export).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Reset", command=self.reset).pack(side=tk.LEFT, padx=(10, 0))
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(buttons, textvariable=self.status_var).pack(side=tk.LEFT, padx=(10, 0))
+
+        self.refresh()
+
+    def close(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+    def refresh(self):
+        stats = tracer.stats()
+        for name in sorted(stats):
+            values = [stats[name][column] for column in COLUMNS]
+            if self.table.exists(name):
+                self.table.item(name, values=values)
+            else:
+                self.table.insert("", tk.END, iid=name, text=name, values=values)
+        self._job = self.root.after(self.refresh_ms, self.refresh)
+
+    def reset(self):
+        tracer.reset()
+        self.table.delete(*self.table.get_children())
+
+    def export(self):
+        try:
+            path = tracer.export(self.trace_file)
+            self.status_var.set(f"Saved {os.path.basename(path)} (open in ui.perfetto.dev)")
+        except OSError as e:
+            self.status_var.set(f"Error: {e}")
@@ -0,0 +1,179 @@
+import atexit
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from startup import PROCESS_START
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class RollingHistogram:
+    """Durations of the most recent `window` occurrences of one span"""
+
+    def __init__(self, window=500):
+        self.values = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, duration_ms):
+        self.values.append(duration_ms)
+        self.count += 1
+
+    def summary(self):
+        values = list(self.values)
+        return {
+            "count": self.count,
+            "last": round(values[-1], 1),
+            "p50": round(percentile(values, 50), 1),
+            "p95": round(percentile(values, 95), 1),
+            "p99": round(percentile(values, 99), 1),
+            "max": round(max(values), 1),
+        }
+
+
+class Span:
+    """Times a `with` block and hands the result to its tracer"""
+
+    __slots__ = ('tracer', 'name', 'args', 'start', 'end', 'thread_id')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = None
+        self.end = None
+        self.thread_id = None
+
+    def __enter__(self):
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.add(self)
+        return False
+
+    @property
+    def duration_ms(self):
+        return (self.end - self.start) * 1000
+
+
+class Tracer:
+    """Collects spans from any thread: a bounded log for export and a rolling histogram per name
+
+    Export uses the Chrome trace-event format, which chrome://tracing and
+    https://ui.perfetto.dev open directly.
+    """
+
+    def __init__(self, max_spans=20000, window=500):
+        self.enabled = True
+        self.window = window
+        self.spans = deque(maxlen=max_spans)
+        self.histograms = {}
+        self._thread_names = {}
+        self._lock = threading.Lock()
+
+    def span(self, name, **args):
+        return Span(self, name, args)
+
+    def record(self, name, start, end=None, **args):
+        """Add a span measured elsewhere, from perf_counter() timestamps"""
+        span = Span(self, name, args)
+        span.thread_id = threading.get_ident()
+        span.start = start
+        span.end = end if end is not None else time.perf_counter()
+        self.add(span)
+        return span
+
+    def add(self, span):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.spans.append(span)
+            histogram = self.histograms.get(span.name)
+            if histogram is None:
+                histogram = self.histograms[span.name] = RollingHistogram(self.window)
+            histogram.add(span.duration_ms)
+            if span.thread_id not in self._thread_names:
+                self._thread_names[span.thread_id] = threading.current_thread().name
+
+    def stats(self):
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.histograms.clear()
+
+    def chrome_trace(self):
+        with self._lock:
+            spans = list(self.spans)
+            thread_names = dict(self._thread_names)
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in thread_names.items()]
+        for span in spans:
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "pid": pid,
+                "tid": span.thread_id,
+                "ts": round((span.start - PROCESS_START) * 1e6, 1),
+                "dur": round((span.end - span.start) * 1e6, 1),
+                "args": span.args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"histograms": self.stats()}}
+
+    def export(self, path):
+        """Write the recorded spans as a Chrome trace-event JSON file"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        return path
+
+
+# Shared by every module so one export covers the whole pipeline
+tracer = Tracer()
+
+
+def span(name, **args):
+    return tracer.span(name, **args)
+
+
+def traced(name=None):
+    """Decorator that wraps each call of a function in a span"""
+    def decorate(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def export_on_exit(path=None):
+    """Export the trace when the process exits; defaults to the TRACE_FILE environment variable"""
+    path = path or os.getenv("TRACE_FILE")
+    if not path:
+        return None
+    # stderr: the CLI's stdout is a JSON-lines stream that must stay parseable
+    atexit.register(lambda: print(f"Trace written to {tracer.export(path)}", file=sys.stderr))
+    return path
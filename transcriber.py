@@ -0,0 +1,270 @@
+import importlib.util
+import json
+import os
+import queue
+import tempfile
+import threading
+from audio_format import to_float32, to_int16
+from startup import lazy_import
+from vad import SpeechSegmenter
+
+sf = lazy_import('soundfile')
+sr = lazy_import('speech_recognition')
+
+# Loaded speech models, shared by every transcriber that uses the same path
+_MODELS = {}
+_MODELS_LOCK = threading.Lock()
+
+
+class TranscriptionError(Exception):
+    pass
+
+
+class TranscriptionStream:
+    """Incremental transcription of audio that is still being recorded
+
+    feed() never blocks the recording loop: chunks are decoded on a worker
+    thread and on_partial is called with the current hypothesis.
+    """
+
+    def __init__(self, sample_rate, on_partial=None):
+        self.sample_rate = sample_rate
+        self.on_partial = on_partial
+        self.partial = ""
+        self.error = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def feed(self, samples):
+        self._queue.put(to_int16(samples))
+
+    def finish(self, timeout=30.0):
+        """Decode what is left and return the final transcript"""
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            # The worker still owns the pending audio; finalizing now would race it
+            raise TranscriptionError(f"Live transcription still running after {timeout:.0f}s")
+        if self.error is not None:
+            raise self.error
+        return self._finalize()
+
+    def _run(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            if self.error is not None:
+                continue
+            try:
+                partial = self._process(chunk)
+            except Exception as e:
+                print(f"Error in live transcription: {e}")
+                self.error = e
+                continue
+            if partial is not None and partial != self.partial:
+                self.partial = partial
+                if self.on_partial:
+                    self.on_partial(partial)
+
+    def _process(self, chunk):
+        raise NotImplementedError
+
+    def _finalize(self):
+        raise NotImplementedError
+
+
+class PhraseTranscriptionStream(TranscriptionStream):
+    """Streams with any engine by transcribing each phrase as soon as the speaker pauses
+
+    Only the phrase in progress is left to transcribe when recording stops.
+    """
+
+    def __init__(self, transcriber, sample_rate, on_partial=None):
+        self.transcriber = transcriber
+        self.segmenter = SpeechSegmenter(sample_rate, min_speech_ms=150, hangover_ms=300)
+        self.phrases = []
+        super().__init__(sample_rate, on_partial)
+
+    def _transcribe_phrase(self, segment):
+        text = self.transcriber.transcribe_array(to_int16(segment), self.sample_rate)
+        if text:
+            self.phrases.append(text)
+
+    def _process(self, chunk):
+        segments = self.segmenter.feed(to_float32(chunk))
+        for segment in segments:
+            self._transcribe_phrase(segment)
+        return " ".join(self.phrases) if segments else None
+
+    def _finalize(self):
+        segment = self.segmenter.flush()
+        if segment is not None:
+            self._transcribe_phrase(segment)
+        return " ".join(self.phrases)
+
+
+class Transcriber:
+    """Common interface for speech-to-text engines"""
+
+    name = "base"
+
+    def transcribe(self, audio_file):
+        raise NotImplementedError
+
+    def transcribe_array(self, samples, sample_rate):
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
+            path = temp_file.name
+        try:
+            sf.write(path, to_int16(samples), sample_rate)
+            return self.transcribe(path)
+        finally:
+            os.unlink(path)
+
+    def start_stream(self, sample_rate, on_partial=None):
+        return PhraseTranscriptionStream(self, sample_rate, on_partial)
+
+    def warm_up(self):
+        """Load whatever the engine needs so the first question isn't slow"""
+        pass
+
+    def warm_up_async(self):
+        thread = threading.Thread(target=self.warm_up)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+
+class GoogleTranscriber(Transcriber):
+    """Google Web Speech API through SpeechRecognition (needs a network connection)"""
+
+    name = "google"
+
+    def __init__(self):
+        self._recognizer = None
+
+    @property
+    def recognizer(self):
+        if self._recognizer is None:
+            self._recognizer = sr.Recognizer()
+        return self._recognizer
+
+    def warm_up(self):
+        self.recognizer
+
+    def transcribe(self, audio_file):
+        with sr.AudioFile(audio_file) as source:
+            audio_data = self.recognizer.record(source)
+        return self.recognizer.recognize_google(audio_data)
+
+    def transcribe_array(self, samples, sample_rate):
+        audio_data = sr.AudioData(to_int16(samples).tobytes(), sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio_data)
+        except sr.UnknownValueError:
+            # Nothing intelligible in this phrase
+            return ""
+
+
+class VoskTranscriber(Transcriber):
+    """Offline CPU transcription with a Vosk model, loaded once and kept in memory"""
+
+    name = "vosk"
+
+    def __init__(self, model_path=None):
+        self.model_path = model_path or os.getenv("VOSK_MODEL_PATH", "models/vosk")
+        if importlib.util.find_spec("vosk") is None:
+            raise TranscriptionError("The vosk package is not installed (pip install vosk)")
+        # Checked here rather than at the first question, so the caller can still pick another engine
+        if not os.path.isdir(self.model_path) or not os.listdir(self.model_path):
+            raise TranscriptionError(f"Vosk model not found at {self.model_path}")
+        self._vosk = lazy_import("vosk")
+
+    @property
+    def model(self):
+        with _MODELS_LOCK:
+            model = _MODELS.get(self.model_path)
+            if model is None:
+                if not os.path.isdir(self.model_path):
+                    raise TranscriptionError(f"Vosk model not found at {self.model_path}")
+                print(f"Loading Vosk model from {self.model_path}...")
+                self._vosk.SetLogLevel(-1)
+                model = self._vosk.Model(self.model_path)
+                _MODELS[self.model_path] = model
+            return model
+
+    def warm_up(self):
+        try:
+            self.model
+        except Exception as e:
+            print(f"Error loading speech model: {e}")
+
+    def recognizer(self, sample_rate):
+        return self._vosk.KaldiRecognizer(self.model, sample_rate)
+
+    def transcribe(self, audio_file):
+        data, rate = sf.read(audio_file, dtype='int16', always_2d=True)
+        return self.transcribe_array(data[:, 0], rate)
+
+    def start_stream(self, sample_rate, on_partial=None):
+        return VoskTranscriptionStream(self, sample_rate, on_partial)
+
+    def transcribe_array(self, samples, sample_rate):
+        recognizer = self.recognizer(sample_rate)
+        samples = to_int16(samples)
+        parts = []
+        step = sample_rate // 2
+        for start in range(0, len(samples), step):
+            if recognizer.AcceptWaveform(samples[start:start + step].tobytes()):
+                parts.append(json.loads(recognizer.Result()).get("text", ""))
+        parts.append(json.loads(recognizer.FinalResult()).get("text", ""))
+        return " ".join(part for part in parts if part)
+
+
+class VoskTranscriptionStream(TranscriptionStream):
+    """Vosk decodes incrementally, so partial hypotheses come straight from the recognizer"""
+
+    def __init__(self, transcriber, sample_rate, on_partial=None):
+        self._recognizer = transcriber.recognizer(sample_rate)
+        self.sentences = []
+        super().__init__(sample_rate, on_partial)
+
+    def _process(self, chunk):
+        if self._recognizer.AcceptWaveform(chunk.tobytes()):
+            text = json.loads(self._recognizer.Result()).get("text", "")
+            if text:
+                self.sentences.append(text)
+            return " ".join(self.sentences)
+        partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        return " ".join(self.sentences + ([partial] if partial else []))
+
+    def _finalize(self):
+        text = json.loads(self._recognizer.FinalResult()).get("text", "")
+        return " ".join(self.sentences + ([text] if text else []))
+
+
+ENGINES = {
+    "google": GoogleTranscriber,
+    "vosk": VoskTranscriber,
+}
+
+
+def create_transcriber(engine=None, fallback=None, **kwargs):
+    """Build the engine named by `engine` or the TRANSCRIBER environment variable
+
+    If that engine can't be set up (no vosk package, no model) and `fallback`
+    names another engine, that one is used instead; otherwise the
+    TranscriptionError is raised.
+    """
+    engine = (engine or os.getenv("TRANSCRIBER") or "google").lower()
+    try:
+        if engine not in ENGINES:
+            raise TranscriptionError(f"Unknown transcription engine: {engine}")
+        return ENGINES[engine](**kwargs)
+    except TranscriptionError as e:
+        if not fallback or fallback == engine:
+            raise
+        print(f"Error loading {engine} transcriber, using {fallback}: {e}")
+        return ENGINES[fallback]()
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import Counter, deque
+from question_index import canonical_question
+from resume_index import tokenize
+
+# Words that carry no question on their own ("um okay yeah" is not worth an API call)
+FILLER_WORDS = set("""um umm uh uhh hmm mm mhm ah er erm oh okay ok yeah yep yes no nope right so well
+like alright sure thanks thank you great cool good nice hi hello bye""".split())
+
+
+def content_words(text):
+    """The words that carry a question's meaning: no stopwords or filler, crudely stemmed"""
+    return frozenset(word for word in tokenize(canonical_question(text or "")) if word not in FILLER_WORDS)
+
+
+class TranscriptGate:
+    """Decides whether a continuous-mode transcript is worth an LLM call
+
+    Empty and filler-only transcripts are skipped, and so is anything that
+    matches a transcript seen in the last `window_seconds`, either exactly
+    after normalization or with the same content words ("so tell me about
+    yourself" repeats "tell me about yourself"). One differing content word
+    makes a new question, so "time complexity" then "space complexity" both
+    get answered. A repeat doesn't refresh the window, so a question asked again much later
+    is answered again.
+    """
+
+    def __init__(self, min_words=2, window_seconds=120, history=10):
+        self.min_words = min_words
+        self.window_seconds = window_seconds
+        self.recent = deque(maxlen=history)
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def check(self, text, record=True):
+        """Return (allowed, reason); reason is "ok", "empty", "trivial", "duplicate" or "near_duplicate"
+
+        With record=False the gate only looks: nothing is counted or remembered.
+        """
+        normalized = canonical_question(text or "")
+        if not normalized:
+            return self._count(False, "empty", record)
+        if len([word for word in normalized.split() if word not in FILLER_WORDS]) < self.min_words:
+            return self._count(False, "trivial", record)
+
+        words = content_words(normalized)
+        now = time.monotonic()
+        with self._lock:
+            while self.recent and now - self.recent[0][0] > self.window_seconds:
+                self.recent.popleft()
+            reason = "ok"
+            for _, previous, previous_words in self.recent:
+                if normalized == previous:
+                    reason = "duplicate"
+                    break
+                if words and words == previous_words:
+                    reason = "near_duplicate"
+                    break
+            else:
+                if record:
+                    self.recent.append((now, normalized, words))
+        return self._count(reason == "ok", reason, record)
+
+    def _count(self, allowed, reason, record):
+        if record:
+            with self._lock:
+                self.counts[reason] += 1
+        return allowed, reason
+
+    def reset(self):
+        with self._lock:
+            self.recent.clear()
+            self.counts.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counts)
+        stats["suppressed"] = sum(count for reason, count in stats.items() if reason != "ok")
+        return stats
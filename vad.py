@@ -0,0 +1,156 @@
+from collections import deque
+import numpy as np
+from audio_format import to_float32
+
+
+class EnergyVAD:
+    """Frame-level speech detection from short-term energy and zero-crossing rate
+
+    Any object with a `frame_length` attribute and a `classify(frames)` method
+    returning one boolean per frame row can be passed to SpeechSegmenter instead.
+    """
+
+    def __init__(self, sample_rate, frame_ms=30, margin_db=10.0, min_energy_db=-55.0,
+                 zcr_max=0.35, noise_adapt=0.05):
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.min_energy_db = min_energy_db
+        self.zcr_max = zcr_max
+        self.noise_adapt = noise_adapt
+        self.noise_floor_db = None
+
+    def reset(self):
+        self.noise_floor_db = None
+
+    def classify(self, frames):
+        frames = np.asarray(frames, dtype=np.float32)
+        if not len(frames):
+            return np.zeros(0, dtype=bool)
+
+        energy_db = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        if self.noise_floor_db is None:
+            self.noise_floor_db = float(np.min(energy_db))
+
+        threshold = max(self.noise_floor_db + self.margin_db, self.min_energy_db)
+        # Voiced speech has low ZCR; very loud frames (fricatives) count regardless
+        speech = (energy_db > threshold) & ((zcr < self.zcr_max) | (energy_db > threshold + self.margin_db))
+
+        # Track the background level from frames judged to be silence
+        if not np.all(speech):
+            quiet = float(np.mean(energy_db[~speech]))
+            self.noise_floor_db += self.noise_adapt * (quiet - self.noise_floor_db)
+        return speech
+
+
+class SpeechSegmenter:
+    """Group VAD frames from a live stream into complete utterances
+
+    With `pause_ms` and `on_pause`, a shorter silence inside an utterance calls
+    `on_pause(samples, index)` with the audio so far and the index of the
+    utterance (the number of utterances returned before it), so a caller can
+    act on it before the utterance is known to be finished.
+    """
+
+    def __init__(self, sample_rate, vad=None, min_speech_ms=300, hangover_ms=700,
+                 pre_roll_ms=200, max_segment_seconds=30, pause_ms=None, on_pause=None):
+        self.sample_rate = sample_rate
+        self.vad = vad or EnergyVAD(sample_rate)
+        frame_ms = 1000.0 * self.vad.frame_length / sample_rate
+        self.min_speech_frames = max(1, int(min_speech_ms / frame_ms))
+        self.hangover_frames = max(1, int(hangover_ms / frame_ms))
+        self.max_segment_frames = int(max_segment_seconds * 1000 / frame_ms)
+        self.pause_frames = max(1, int(pause_ms / frame_ms)) if pause_ms and on_pause else None
+        self.on_pause = on_pause
+        self.utterances = 0
+        self._pre_roll = deque(maxlen=max(1, int(pre_roll_ms / frame_ms)))
+        self.reset()
+
+    def reset(self):
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._pre_roll.clear()
+        self._segment = []
+        self._speech_frames = 0
+        self._silence_frames = 0
+        self.utterances = 0
+        if hasattr(self.vad, 'reset'):
+            self.vad.reset()
+
+    @property
+    def in_speech(self):
+        return bool(self._segment)
+
+    def feed(self, samples):
+        """Consume mono float or int16 samples and return the list of utterances that finished"""
+        # Always copy: callers may pass views into a buffer that keeps being written
+        samples = np.concatenate([self._pending, to_float32(samples).reshape(-1)])
+
+        size = self.vad.frame_length
+        count = len(samples) // size
+        self._pending = samples[count * size:].copy()
+        if not count:
+            return []
+
+        frames = samples[:count * size].reshape(count, size)
+        speech = self.vad.classify(frames)
+
+        segments = []
+        for frame, is_speech in zip(frames, speech):
+            if not self._segment:
+                if is_speech:
+                    self._segment = list(self._pre_roll)
+                    self._segment.append(frame)
+                    self._speech_frames = 1
+                    self._silence_frames = 0
+                else:
+                    self._pre_roll.append(frame)
+                continue
+
+            self._segment.append(frame)
+            if is_speech:
+                self._speech_frames += 1
+                self._silence_frames = 0
+            else:
+                self._silence_frames += 1
+                if (self._silence_frames == self.pause_frames and self._silence_frames < self.hangover_frames
+                        and self._speech_frames >= self.min_speech_frames):
+                    self._pause()
+
+            if self._silence_frames >= self.hangover_frames or len(self._segment) >= self.max_segment_frames:
+                segment = self._finish()
+                if segment is not None:
+                    segments.append(segment)
+        return segments
+
+    def _pause(self):
+        keep = len(self._segment) - max(0, self._silence_frames - self._pre_roll.maxlen)
+        try:
+            self.on_pause(np.concatenate(self._segment[:keep]), self.utterances)
+        except Exception as e:
+            print(f"Error in pause callback: {e}")
+
+    def flush(self):
+        """Return the utterance in progress, if it is long enough to keep"""
+        if not self._segment:
+            return None
+        return self._finish()
+
+    def _finish(self):
+        segment = self._segment
+        speech_frames = self._speech_frames
+        trailing = self._silence_frames
+        self._segment = []
+        self._speech_frames = 0
+        self._silence_frames = 0
+        self._pre_roll.clear()
+
+        if speech_frames < self.min_speech_frames:
+            # Clicks and short noises never reach transcription
+            return None
+        # Keep a little of the trailing silence, drop the rest of the hangover
+        keep = len(segment) - max(0, trailing - self._pre_roll.maxlen)
+        self.utterances += 1
+        return np.concatenate(segment[:keep])